@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import re
+import socket
+import sys
+import tempfile
+
+# Talks to `python -m ciscoconfaudit.server serve` with the standard library
+# only, so a commit hook pays for Python startup and nothing else. Usage:
+#   python3 audit_client.py switch01.txt [more configs...]
+#   git show HEAD:switch01.txt | python3 audit_client.py -
+
+if os.environ.get("XDG_RUNTIME_DIR"):
+    SOCKET = os.path.join(
+        os.environ["XDG_RUNTIME_DIR"], f"ciscoconfaudit-{os.getuid()}.sock"
+    )
+else:
+    SOCKET = os.path.join(
+        tempfile.gettempdir(), f"ciscoconfaudit-{os.getuid()}", "audit.sock"
+    )
+
+
+def strip_markup(text):
+    return re.sub(r"\[/?[a-z][a-z ]*\]", "", text)
+
+
+if __name__ == "__main__":
+    failed = False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        address = os.environ.get("CISCOCONFAUDIT_SOCKET", SOCKET)
+        # Configs hold secrets: never send them to another user's socket
+        if os.stat(address).st_uid != os.getuid():
+            sys.exit(f"{address} belongs to another user")
+        sock.connect(address)
+        stream = sock.makefile("rwb")
+        for path in sys.argv[1:] or ["-"]:
+            text = sys.stdin.read() if path == "-" else open(path).read()
+            stream.write(json.dumps({"config": text, "source": path}).encode() + b"\n")
+            stream.flush()
+            result = json.loads(stream.readline())
+            if result.get("error"):
+                print(f"{path}: {result['error']}", file=sys.stderr)
+                failed = True
+                continue
+            for rule_id, target, status, message, template in (
+                result["global_findings"] + result["interface_findings"]
+            ):
+                if template:
+                    message = message.format(target)
+                if status == "FAIL":
+                    failed = True
+                    print(f"{path}: {rule_id} {target}: {strip_markup(message)}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+from ciscoconfaudit import Status, audit_many
+
+if __name__ == "__main__":
+    # Audit every saved config in the current directory on all CPU cores
+    configs = sorted(Path(".").glob("*.txt"))
+    for result in audit_many(configs, workers=None):
+        if result.error:
+            print(f"{result.source}: {result.error}")
+            continue
+        failed = [f for f in result.findings if f.status is Status.FAIL]
+        print(f"{result.source} ({result.hostname}): {len(failed)} failed checks")
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+from ciscoconfaudit import FakeTransport, Status, collect_audit, netmiko_fetch
+
+devices = [
+    {
+        "device_type": "cisco_ios",
+        "host": "devnetsandboxiosxe.cisco.com",
+        "username": "admin",
+        "password": "C1sco12345",
+    }
+]
+
+if __name__ == "__main__":
+    # --fake serves config-sample.txt instead of connecting to the devices
+    if "--fake" in sys.argv:
+        fetch = FakeTransport(Path("config-sample.txt"), delay=0.5)
+        devices = [{"host": f"10.0.0.{i}"} for i in range(1, 51)]
+    else:
+        fetch = netmiko_fetch
+    for result in collect_audit(devices, fetch, concurrency=16, timeout=60):
+        if result.error:
+            print(f"{result.source}: {result.error}")
+            continue
+        failed = [f for f in result.findings if f.status is Status.FAIL]
+        print(f"{result.source} ({result.hostname}): {len(failed)} failed checks")
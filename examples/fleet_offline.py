@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+from ciscoconfaudit import ComplianceMatrix, iter_audit
+
+if __name__ == "__main__":
+    # Aggregate the audit of every saved config in the current directory
+    configs = sorted(Path(".").glob("*.txt"))
+    matrix = ComplianceMatrix.from_results(iter_audit(configs))
+    for rule_id, failed in matrix.top_failing(10):
+        print(f"{rule_id}: {failed}/{len(matrix)} devices fail", file=sys.stderr)
+    matrix.write_summary(sys.stdout)
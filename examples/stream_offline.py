@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+from ciscoconfaudit import iter_configs, stream_report
+
+if __name__ == "__main__":
+    # Stream the findings of every saved config as JSON Lines to stdout.
+    # An optional argument names a backup archive (tar, gzip or concatenated
+    # configs) to read the configs from instead.
+    if len(sys.argv) > 1:
+        configs = iter_configs(sys.argv[1])
+    else:
+        configs = sorted(Path(".").glob("*.txt"))
+    stream_report(configs, sys.stdout, fmt="jsonl")
@@ -1,717 +1,671 @@
 # -*- coding: utf-8 -*-
-from ciscoconfparse2 import CiscoConfParse
-from rich.console import Console
-from rich.table import Table
+import hashlib
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+from .batch import audit_config, audit_many, iter_audit, stream_report
+from .bits import iter_bits
+from .blockstore import BlockStore, ConfigBlocks, config_blocks
+from .collect import FakeTransport, collect_audit, netmiko_fetch
+from .facts import (
+    ACCESS,
+    ENDS_SHUTDOWN,
+    EXEC_TIMEOUT,
+    HOSTNAME,
+    INTERFACE_RULE_TAGS,
+    INTERFACE_RULES,
+    INTERFACE_RULES_BY_ID,
+    LOGGING_SYNC,
+    NO_IP_ADDRESS,
+    TRANSPORT_SSH,
+    VLAN1_RULE,
+    VTY_EXEC_TIMEOUT_RULE,
+    VTY_LOGGING_SYNC_RULE,
+    VTY_SSH_RULE,
+    BlockFacts,
+    ConfigFacts,
+    InterfaceRule,
+    extract_facts,
+    extract_line_facts,
+)
+from .fleet import ComplianceMatrix
+from .incremental import IncrementalAuditor
+from .ingest import DeviceConfig, iter_configs
+from .lineindex import LineIndex
+from .report import (
+    FAIL,
+    NOT_FOUND,
+    NOT_IN_USE,
+    PASS,
+    RECOMMENDED,
+    STATUS_MARKUP,
+    SUMMARY_TOP,
+    UNAVAILABLE,
+    WARN,
+    CsvWriter,
+    JsonLinesWriter,
+    ReportWriter,
+    create_table,
+    render_table,
+)
+from .results import DEVICE, DeviceResult, Finding, Status
+from .rulepack import DEFAULT_RULE_PACK, RulePack, rule_pack
+from .rules import (
+    CONFIG,
+    GLOBAL_RULE_TAGS,
+    GLOBAL_RULES,
+    OPTIONAL,
+    SERVICE,
+    VULN,
+    GlobalRule,
+    GlobalRuleEngine,
+)
+from .stats import AuditStats, write_openmetrics
+
+if TYPE_CHECKING:
+    from ciscoconfparse2 import CiscoConfParse
+    from rich.console import Console
+    from rich.table import Table
+
+GLOBAL_ENGINE = DEFAULT_RULE_PACK.engine
 
 __version__ = "0.2.1"
-__all__ = ["ciscoconfaudit"]
+__all__ = [
+    "AuditStats",
+    "BlockFacts",
+    "BlockStore",
+    "CiscoConfAudit",
+    "ComplianceMatrix",
+    "ConfigFacts",
+    "CsvWriter",
+    "DeviceConfig",
+    "DeviceResult",
+    "FakeTransport",
+    "DEFAULT_RULE_PACK",
+    "Finding",
+    "GlobalRule",
+    "GlobalRuleEngine",
+    "GLOBAL_RULE_TAGS",
+    "GLOBAL_RULES",
+    "INTERFACE_RULE_TAGS",
+    "INTERFACE_RULES",
+    "IncrementalAuditor",
+    "InterfaceRule",
+    "JsonLinesWriter",
+    "LineIndex",
+    "ReportWriter",
+    "RulePack",
+    "Status",
+    "audit_config",
+    "audit_many",
+    "collect_audit",
+    "config_digest",
+    "extract_facts",
+    "extract_line_facts",
+    "iter_audit",
+    "iter_configs",
+    "netmiko_fetch",
+    "parse_config",
+    "rule_pack",
+    "stream_report",
+    "write_openmetrics",
+]
 PY_MAJ_VER = 3
 PY_MIN_VER = 9
 MIN_PYTHON_VER = "3.9"
 
-FAIL = "[bold red]:heavy_multiplication_x: FAIL[/bold red]"
-PASS = "[bold green]:heavy_check_mark: PASS[/bold green]"
-RECOMMENDED = "[bold blue]RECOMMENDED[/bold blue]"
-WARN = "[bold yellow]WARN[/bold yellow]"
-NOT_IN_USE = "[bold white]NOT IN USE[/bold white]"
-UNAVAILABLE = "[bold white]UNAVAILABLE[/bold white]"
 ACC_INTF_VERIFY = "([yellow]Check access ports configuration[/yellow])"
 L3_INTF_VERIFY = "([yellow]Verify L3 interfaces configuration[/yellow])"
-IS_ACCESS_PORT = r"^\sswitchport\smode\saccess$"
+
+# Global rule kind -> (status when the pattern is absent, status when present)
+GLOBAL_STATUS = {
+    SERVICE: (Status.PASS, Status.FAIL),
+    CONFIG: (Status.FAIL, Status.PASS),
+    OPTIONAL: (Status.RECOMMENDED, Status.PASS),
+    VULN: (Status.NOT_IN_USE, Status.WARN),
+}
+
+
+def __getattr__(name: str):
+    # Third-party classes this module used to import eagerly; ciscoconfparse2
+    # and rich are slow to import and most audits never need them
+    if name == "CiscoConfParse":
+        from ciscoconfparse2 import CiscoConfParse
+
+        return CiscoConfParse
+    if name in ("Console", "Table"):
+        import importlib
+
+        return getattr(importlib.import_module(f"rich.{name.lower()}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Number of parsed configs kept by parse_config(), keyed by content hash
+PARSE_CACHE_SIZE = 8
+_parse_cache: "OrderedDict[str, CiscoConfParse]" = OrderedDict()
+
+
+def config_digest(running_config: str) -> str:
+    return hashlib.sha256(running_config.encode("utf-8")).hexdigest()
+
+
+def parse_config(running_config: str) -> "CiscoConfParse":
+    """Parse `running_config`, reusing a cached parse of identical text."""
+    digest = config_digest(running_config)
+    parse = _parse_cache.get(digest)
+    if parse is not None:
+        _parse_cache.move_to_end(digest)
+        return parse
+    from ciscoconfparse2 import CiscoConfParse
+
+    parse = CiscoConfParse(running_config.splitlines(), syntax="ios", factory=True)
+    _parse_cache[digest] = parse
+    while len(_parse_cache) > PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return parse
+
+
+# Interface-level checks, in report order -> ids of the rules they report
+INTERFACE_CHECKS = {
+    "check_vlan1": (VLAN1_RULE,),
+    "check_mop": ("I001",),
+    "check_port_security": ("I002",),
+    "check_stp_portfast": ("I003",),
+    "check_stp_bpdu": ("I004",),
+    "check_stp_root": ("I005",),
+    "check_cdp": ("I006",),
+    "check_lldp": ("I007",),
+    "check_ip_src_verify": ("I008",),
+    "check_sticky_mac": ("I009",),
+    "check_arp_proxy": ("I010",),
+    "check_ip_redirects": ("I011",),
+    "check_ip_unreachables": ("I014",),
+    "check_directed_broadcast": ("I013",),
+    "check_lines": (VTY_SSH_RULE, VTY_EXEC_TIMEOUT_RULE, VTY_LOGGING_SYNC_RULE),
+}
+# Methods timed by AuditStats -> stage name
+TIMED_STAGES = {
+    "global_config": "global_config",
+    "interface_config": "interface_config",
+    "get_report": "render",
+    **{check: check for check in INTERFACE_CHECKS},
+}
 
 
 class CiscoConfAudit(object):
-    def __init__(self, global_table=None, interface_table=None, parse=None):
-        self.console = Console(record=True, tab_size=4)
-        self.global_table: Table = global_table
-        self.interface_table: Table = interface_table
-        self.parse: CiscoConfParse = parse
-
-    def create_table(self, title: str) -> Table:
-        table = Table(
-            show_header=True,
-            show_edge=True,
-            show_lines=False,
-            expand=True,
-            highlight=True,
-            caption=f"End of {title}",
-            title=f"[bold magenta]{title}[/bold magenta]",
+    def __init__(
+        self,
+        global_table=None,
+        interface_table=None,
+        parse=None,
+        stats: Union[bool, AuditStats] = False,
+        rules: RulePack = DEFAULT_RULE_PACK,
+        fail_fast: bool = False,
+        record: bool = True,
+        blocks: Optional[BlockStore] = None,
+    ):
+        self._console: Optional["Console"] = None
+        # Whether the console keeps what it prints for save_html() & co.
+        self.record = record
+        self.global_findings: Optional[List[Finding]] = None
+        self.interface_findings: Optional[List[Finding]] = None
+        self._global_table: Optional["Table"] = global_table
+        self._interface_table: Optional["Table"] = interface_table
+        self._parse: Optional["CiscoConfParse"] = parse
+        # Line index of the loaded config, enough for every built-in check
+        self.index: Optional[LineIndex] = None
+        self.running_config: Optional[str] = None
+        self.digest: Optional[str] = None
+        self._facts: Optional[ConfigFacts] = None
+        self._hostname: Optional[str] = None
+        # Verdicts of the blocks of the loaded config, False if it has to be
+        # indexed as a whole
+        self._block_verdicts: Union[ConfigBlocks, bool, None] = None
+        # Seconds spent indexing / parsing the loaded config
+        self.parse_time: float = 0.0
+        self.stats: Optional[AuditStats] = None
+        self.rules = rules
+        # Store of block verdicts shared between the audits of a batch run
+        # (rules.blocks there); None to index and match each config whole
+        self.blocks: Optional[BlockStore] = blocks
+        # Stop auditing at the first check that fails
+        self.fail_fast = fail_fast
+        if stats:
+            self.stats = stats if isinstance(stats, AuditStats) else AuditStats()
+            self.stats.instrument(
+                self, TIMED_STAGES, ("global_config", "interface_config", "get_report")
+            )
+
+    def select(self, running_config: Union[str, "CiscoConfParse", None] = None):
+        # Switch to `running_config` unless it is None or already loaded; it
+        # is only indexed once something needs the line index
+        if running_config is None:
+            if self.running_config is None and self._parse is None:
+                raise ValueError("No running config has been loaded")
+            return
+        if not isinstance(running_config, str):
+            # A CiscoConfParse object
+            if running_config is not self._parse:
+                self.parse = running_config
+            return
+        digest = config_digest(running_config)
+        if digest == self.digest:
+            return
+        self._parse, self.index, self.running_config = None, None, running_config
+        self.digest, self._hostname, self.parse_time = digest, None, 0.0
+        self._facts, self._block_verdicts = None, None
+        self.reset_findings()
+
+    def reset_findings(self):
+        # Findings and tables of the previous config
+        self.global_findings, self.interface_findings = None, None
+        self._global_table, self._interface_table = None, None
+
+    def load(
+        self, running_config: Union[str, "CiscoConfParse", None] = None
+    ) -> LineIndex:
+        # Line index of the given config, or of the loaded one
+        self.select(running_config)
+        if self.index is None:
+            if self.running_config is None:
+                self.index = LineIndex(self._parse.get_text())
+                return self.index
+            start = time.perf_counter()
+            self.index = LineIndex.from_text(self.running_config)
+            elapsed = time.perf_counter() - start
+            self.parse_time += elapsed
+            if self.stats is not None:
+                self.stats.record("index", elapsed)
+        return self.index
+
+    def block_verdicts(self) -> Optional[ConfigBlocks]:
+        """Global matches and facts of the loaded config from the block store.
+
+        None without a store, or when the config has blocks that cannot be
+        audited on their own and it is indexed as a whole instead.
+        """
+        self.select()
+        if self.blocks is None or self.running_config is None:
+            return None
+        if self._block_verdicts is None:
+            start = time.perf_counter()
+            self._block_verdicts = (
+                config_blocks(self.running_config.splitlines(), self.rules, self.blocks)
+                or False
+            )
+            # Splitting and hashing the blocks stands in for the indexing
+            elapsed = time.perf_counter() - start
+            self.parse_time += elapsed
+            if self.stats is not None:
+                self.stats.record("blocks", elapsed)
+        return self._block_verdicts or None
+
+    @property
+    def parse(self) -> Optional["CiscoConfParse"]:
+        # The full CiscoConfParse tree is only built when something asks for
+        # it; the built-in checks all run on the line index
+        if self._parse is None and self.running_config is not None:
+            start = time.perf_counter()
+            self._parse = parse_config(self.running_config)
+            elapsed = time.perf_counter() - start
+            self.parse_time += elapsed
+            if self.stats is not None:
+                self.stats.record("parse", elapsed)
+        return self._parse
+
+    @parse.setter
+    def parse(self, parse: Optional["CiscoConfParse"]):
+        self._parse, self.index, self.running_config = parse, None, None
+        self.digest, self._hostname, self.parse_time = None, None, 0.0
+        self._facts, self._block_verdicts = None, None
+        self.reset_findings()
+
+    @property
+    def console(self) -> "Console":
+        # Rich is only imported once something is rendered
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(record=self.record, tab_size=4)
+        return self._console
+
+    @console.setter
+    def console(self, console: "Console"):
+        self._console = console
+
+    @property
+    def hostname(self) -> str:
+        if self._hostname is None:
+            blocks = self.block_verdicts()
+            if blocks is None:
+                self._hostname = self.load().re_match_iter_typed(
+                    HOSTNAME, default="Device"
+                )
+            else:
+                self._hostname = blocks.hostname or "Device"
+        return self._hostname
+
+    @hostname.setter
+    def hostname(self, hostname: str):
+        self._hostname = hostname
+
+    @property
+    def findings(self) -> List[Finding]:
+        return (self.global_findings or []) + (self.interface_findings or [])
+
+    # Rich tables are only built when asked for
+    @property
+    def global_table(self) -> Optional["Table"]:
+        if self._global_table is None and self.global_findings is not None:
+            self._global_table = render_table(
+                f"{self.hostname} Global Config Audit", self.global_findings
+            )
+        return self._global_table
+
+    @global_table.setter
+    def global_table(self, table: Optional["Table"]):
+        self._global_table = table
+
+    @property
+    def interface_table(self) -> Optional["Table"]:
+        if self._interface_table is None and self.interface_findings is not None:
+            self._interface_table = render_table(
+                f"{self.hostname} Interface-Level Audit", self.interface_findings
+            )
+        return self._interface_table
+
+    @interface_table.setter
+    def interface_table(self, table: Optional["Table"]):
+        self._interface_table = table
+
+    def create_table(self, title: str) -> "Table":
+        return create_table(title)
+
+    def add_global(self, rule_id: str, status: Status, message: str):
+        self.global_findings.append(Finding(rule_id, DEVICE, status, message))
+
+    def add_interface(
+        self,
+        rule_id: str,
+        status: Status,
+        message: str,
+        target: str = DEVICE,
+        template: bool = False,
+    ):
+        # With `template`, the message is `message.format(target)`, formatted
+        # only when it is reported
+        self.interface_findings.append(
+            Finding(rule_id, target, status, message, template)
         )
-        table.add_column(header="Audit", no_wrap=True)
-        table.add_column(header="Status", no_wrap=True)
-        return table
 
     # Configuration Checks
-    def check_service(self, pattern: str, cmd: str):
+    def check_service(self, pattern: str, cmd: str, rule_id: str = ""):
         if self.parse.find_objects(pattern):
-            self.global_table.add_row(cmd, FAIL)
+            self.add_global(rule_id, Status.FAIL, cmd)
         else:
-            self.global_table.add_row(cmd, PASS)
+            self.add_global(rule_id, Status.PASS, cmd)
 
-    def check_config(self, pattern: str, cmd: str):
+    def check_config(self, pattern: str, cmd: str, rule_id: str = ""):
         if self.parse.find_objects(pattern):
-            self.global_table.add_row(cmd, PASS)
+            self.add_global(rule_id, Status.PASS, cmd)
         else:
-            self.global_table.add_row(cmd, FAIL)
+            self.add_global(rule_id, Status.FAIL, cmd)
 
-    def check_vuln_config(self, pattern: str, cmd: str):
-        if not self.parse.find_objects(pattern):
-            self.global_table.add_row(cmd, NOT_IN_USE)
-        elif self.parse.find_objects(pattern):
-            self.global_table.add_row(cmd, WARN)
+    def check_vuln_config(self, pattern: str, cmd: str, rule_id: str = ""):
+        if self.parse.find_objects(pattern):
+            self.add_global(rule_id, Status.WARN, cmd)
         else:
-            self.global_table.add_row(cmd, PASS)
+            self.add_global(rule_id, Status.NOT_IN_USE, cmd)
 
-    def check_optional_config(self, pattern: str, cmd: str):
+    def check_optional_config(self, pattern: str, cmd: str, rule_id: str = ""):
         if self.parse.find_objects(pattern):
-            self.global_table.add_row(cmd, PASS)
+            self.add_global(rule_id, Status.PASS, cmd)
         else:
-            self.global_table.add_row(cmd, RECOMMENDED)
+            self.add_global(rule_id, Status.RECOMMENDED, cmd)
 
     # Global Config Audit
-    def global_config(self, running_config: str):
-        # Parse configuration
-        self.parse = CiscoConfParse(
-            running_config.splitlines(), syntax="ios", factory=True
-        )
-        hostname = self.parse.re_match_iter_typed(
-            r"^hostname\s+(\S+)", default="Device"
-        )
-        self.global_table = self.create_table(f"{hostname} Global Config Audit")
-        # Perform checks and populate the table
-        self.check_service(
-            r"^service\stcp-small-servers$", "no service tcp-small-servers"
-        )
-        self.check_service(
-            r"^service\sudp-small-servers$", "no service udp-small-servers"
-        )
-        self.check_service(r"^no\sip\sfinger$", "no ip finger")
-        self.check_service(r"^no\sservice\sfinger$", "no service finger")
-        self.check_service(r"^no\sip\sbootp\sserver$", "no ip bootp server")
-        self.check_config(r"^ip\sdhcp\sbootp\signore$", "ip dhcp bootp ignore")
-        self.check_config(
-            r"^no\sip\sdomain-lookup$|^no\sip\sdomain\slookup$",
-            "no ip domain-lookup | no ip domain lookup",
-        )
-        self.check_config(
-            r"^ip\sdomain\sname\s\w+$|^ip\sdomain-name\s\w+$",
-            "ip domain name <domain> | ip domain-name <domain>",
-        )
-        self.check_service(r"^no\sservice\spad$", "no service pad")
-        self.check_config(r"^no\sip\shttp\sserver$", "no ip http server")
-        self.check_config(r"^no\sip\shttp\ssecure-server$", "no ip http secure-server")
-        self.check_service(r"^no\sservice\sconfig$", "no service config")
-        self.check_config(
-            r"^no\sservice\spassword-recovery$",
-            "no service password-recovery ([yellow]Use with caution[/yellow])",
-        )
-        self.check_service(r"^service\scall-home$", "no service call-home")
-        self.check_service(
-            r"^service\spassword-encryption$", "service password-encryption"
-        )
-        self.check_config(
-            r"^service\stimestamps\slog\sdatetime\smsec\slocaltime\sshow-timezone\syear$",
-            "service timestamps log datetime msec localtime show-timezone year",
-        )
-        self.check_config(
-            r"^service\stimestamps\sdebug\sdatetime\smsec\slocaltime\sshow-timezone\syear$",
-            "service timestamps debug datetime msec localtime show-timezone year",
-        )
-        self.check_config(r"^service\stcp-keepalives-in$", "service tcp-keepalives-in")
-        self.check_config(
-            r"^service\stcp-keepalives-out$", "service tcp-keepalives-out"
-        )
-        self.check_config(
-            r"^configuration\smode\sexclusive\sauto$",
-            "configuration mode exclusive auto",
-        )
-        self.check_config(r"^secure\sboot-image$", "secure boot-image")
-        self.check_config(r"^secure\sboot-config\W$", "secure boot-config")
-        self.check_config(r"^banner\smotd", "banner motd")
-        self.check_config(r"^udld\senable$", "udld enable")
-        self.check_config(r"^ip\sdhcp\ssnooping$", "ip dhcp snooping")
-        self.check_config(
-            r"^ip\sdhcp\ssnooping\svlan\s\d+(?:,\d+)*$",
-            "ip dhcp snooping vlan <vlan-range>",
-        )
-        self.check_config(
-            r"^ip\sarp\sinspection\svlan\s\d+(?:,\d+)*$",
-            "ip arp inspection vlan <vlan-range>",
-        )
-        self.check_config(
-            r"^ip\sdhcp\ssnooping\sinformation\soption$",
-            "ip dhcp snooping information option",
-        )
-        self.check_config(r"^ip\sssh\sversion\s2$", "ip ssh version 2")
-        self.check_config(r"^ip\sssh\stime-out\s60$", "ip ssh time-out 60")
-        self.check_config(
-            r"^ip\sssh\sauthentication-retries\s3$", "ip ssh authentication-retries 3"
-        )
-        self.check_config(
-            r"^ip\sssh\sdh\smin\ssize\s(2048|4096)$", "ip ssh dh min size 2048|4096"
-        )
-        self.check_optional_config(
-            r"^ip\sssh\sserver\salgorithm\sencryption\saes\d{3}-ctr\saes\d{3}-ctr\saes\d{3}-ctr$",
-            "ip ssh server algorithm encryption aes128-ctr aes192-ctr aes256-ctr",
-        )
-        self.check_optional_config(
-            r"^ip\sssh\sclient\salgorithm\sencryption\saes\d{3}-ctr\saes\d{3}-ctr\saes\d{3}-ctr$",
-            "ip ssh client algorithm encryption aes128-ctr aes192-ctr aes256-ctr",
-        )
-        self.check_config(r"^no\sip\ssource-route$", "no ip source-route")
-        self.check_config(r"^no\sipv6\ssource-route$", "no ipv6 source-route")
-        self.check_config(
-            r"^no\sip\sgratuitous-arps$|^no\sip\sarp\sgratuitous$",
-            "no ip gratuitous-arps | no ip arp gratuitous",
-        )
-        self.check_config(r"^ip\soptions\sdrop$", "ip options drop")
-        self.check_config(r"^no\svstack$", "no vstack")
-        self.check_config(r"^no\slogging\sconsole$", "no logging console")
-        self.check_config(r"^no\slogging\smonitor$", "no logging monitor")
-        self.check_config(
-            r"^memory\sfree\slow-watermark\sprocessor\s\d{1,7}$",
-            "memory free low-watermark processor <threshold>",
-        )
-        self.check_config(
-            r"^memory\sfree\slow-watermark\sio\s\d{1,7}$",
-            "memory free low-watermark io <threshold>",
-        )
-        self.check_config(
-            r"^memory\sreserve\scritical\s\d{1,10}$", "memory reserve critical <value>"
-        )
-        self.check_optional_config(
-            r"^exception\scrashinfo\smaximum\sfiles\s\d+$",
-            "exception crashinfo maximum files <number-of-files>",
-        )
-        self.check_optional_config(
-            r"^vtp\smode\s(transparent|off)$", "vtp mode transparent|off"
-        )
-        self.check_optional_config(
-            r"^no\ssystem\signore\sstartupconfig\sswitch\sall$",
-            "no system ignore startupconfig switch all",
-        )
-        self.check_optional_config(
-            r"^diagnostic\sbootup\slevel\sminimal$", "diagnostic bootup level minimal"
-        )
-        self.check_optional_config(
-            r"^software\sauto-upgrade\senable$", "software auto-upgrade enable"
-        )
-        self.check_optional_config(
-            r"^license\ssmart\stransport\soff$", "license smart transport off"
-        )
-        self.check_optional_config(r"^login\son-success\slog$", "login on-success log")
-        self.check_optional_config(r"^login\son-failure\slog$", "login on-failure log")
-        self.check_optional_config(
-            r"^clock\stimezone\s\w{3,4}\s-?\d{1,2}\s-?\d{1,2}$",
-            "clock timezone <timezone> <hours_offset> <mintues_offset>",
-        )
-        self.check_config(r"^ntp\sserver\s\d", "ntp server")
-        # IOS and IOS-XE versions only
-        self.check_config(
-            r"^no\sntp\sallow\smode\scontrol\s0$", "no ntp allow mode control 0"
-        )
-        self.check_config(
-            r"^username\s\w+\sprivilege\s\d{1,2}\ssecret\s[8-9]\s",
-            "username <username> privilege <priv_level> secret [8-9] <password>",
-        )
-        self.check_config(
-            r"^enable\salgorithm-type\sscrypt\ssecret\s",
-            "enable algorithm-type scrypt secret <password>",
-        )
-        # Check for AAA settings
-        if self.parse.find_objects(r"^no\saaa\snew-model$"):
-            self.global_table.add_row("aaa new-model", FAIL)
-        else:
-            self.global_table.add_row("aaa new-model", PASS)
-            # Authentication
-            self.check_config(
-                r"^aaa\sauthentication\slogin\sdefault\sgroup\stacacs\+\senable$",
-                "aaa authentication login default group tacacs+ enable",
-            )
-            self.check_config(
-                r"^aaa\sauthentication\sattempts\slogin\s\d+$",
-                "aaa authentication attempts login <max-attempts>",
-            )
-            # Authorization
-            self.check_config(
-                r"^aaa\sauthorization\sexec\sdefault\sgroup\stacacs\snone$",
-                "aaa authorization exec default group tacacs none",
-            )
-            self.check_config(
-                r"^aaa\sauthorization\scommands\s0\sdefault\sgroup\stacacs\snone$",
-                "aaa authorization commands 0 default group tacacs none",
-            )
-            self.check_config(
-                r"^aaa\sauthorization\scommands\s1\sdefault\sgroup\stacacs\snone$",
-                "aaa authorization commands 1 default group tacacs none",
-            )
-            self.check_config(
-                r"aaa\sauthorization\scommands\s15\sdefault\sgroup\stacacs\snone",
-                "aaa authorization commands 15 default group tacacs none",
-            )
-            # Accounting
-            self.check_config(
-                r"^aaa\saccounting\sexec\sdefault\sstart-stop\sgroup\stacacs$",
-                "aaa accounting exec default start-stop group tacacs",
-            )
-            self.check_config(
-                r"^aaa\saccounting\scommands\s0\sdefault\sstart-stop\sgroup\stacacs$",
-                "aaa accounting commands 0 default start-stop group tacacs",
-            )
-            self.check_config(
-                r"^aaa\saccounting\scommands\s0\sdefault\sstart-stop\sgroup\stacacs$",
-                "aaa accounting commands 0 default start-stop group tacacs",
-            )
-            self.check_config(
-                r"^aaa\saccounting\scommands\s15\sdefault\sstart-stop\sgroup\stacacs",
-                "aaa accounting commands 15 default start-stop group tacacs",
-            )
+    def global_config(self, running_config: Union[str, "CiscoConfParse", None] = None):
+        # Known blocks are looked up in the block store, the others indexed
+        # and matched on their own; without the store the whole config is
+        # indexed (or the index already loaded reused)
+        self.select(running_config)
+        blocks = self.block_verdicts()
+        if blocks is not None:
+            self.apply_global(blocks.matches)
+            return
+        # Evaluate all global rules in one pass
+        self.apply_global(self.rules.engine.match(self.load().lines))
 
-        # Check for weak SNMPv2c community strings
-        self.check_vuln_config(
-            r"^snmp-server\scommunity\sprivate\srw$|^snmp-server\scommunity\spublic\sro$",
-            "Weak SNMPv2c community string (Trivial authentication)",
-        )
+    def apply_global(self, matches: Sequence[bool]):
+        # Record the global findings given whether each rule's pattern matched
+        self.global_findings, self._global_table = [], None
+        for rule, matched in self.rules.engine.verdicts(matches):
+            status = GLOBAL_STATUS[rule.kind][matched]
+            self.add_global(rule.rule_id, status, rule.cmd)
+            if self.fail_fast and status is Status.FAIL:
+                break
 
     # Interface-Level Audit
-    def interface_config(self, running_config: str):
-        self.parse = CiscoConfParse(
-            running_config.splitlines(), syntax="ios", factory=True
-        )
-        hostname = self.parse.re_match_iter_typed(
-            r"^hostname\s+(\S+)", default="Device"
-        )
-        self.interface_table = self.create_table(f"{hostname} Interface-Level Audit")
-        self.check_vlan1(self.parse)
-        self.check_mop(self.parse)
-        self.check_port_security(self.parse)
-        self.check_stp_portfast(self.parse)
-        self.check_stp_bpdu(self.parse)
-        self.check_stp_root(self.parse)
-        self.check_cdp(self.parse)
-        self.check_lldp(self.parse)
-        self.check_ip_src_verify(self.parse)
-        self.check_sticky_mac(self.parse)
-        self.check_arp_proxy(self.parse)
-        self.check_ip_redirects(self.parse)
-        self.check_ip_unreachables(self.parse)
-        self.check_directed_broadcast(self.parse)
-        self.check_lines(self.parse)
-
-    def check_vlan1(self, parse: CiscoConfParse):
-        # sourcery skip: use-named-expression
-        vlan1_intf = parse.find_objects(linespec=r"^interface\s[vV]lan1$")
-        if not vlan1_intf:
-            self.interface_table.add_row(
-                "'interface Vlan1'", "[bold white]NOT FOUND[/bold white]"
-            )
-        else:
-            msg = "'{0:s}' has no ip address and is shutdown"
-            for vlan1_obj in vlan1_intf:
-                if vlan1_obj.has_child_with(
-                    r"\sshutdown$"
-                ) and vlan1_obj.has_child_with(r"\sno\sip\saddress$"):
-                    self.interface_table.add_row(msg.format(vlan1_obj.text), PASS)
-                else:
-                    self.interface_table.add_row(msg.format(vlan1_obj.text), FAIL)
+    def interface_config(
+        self, running_config: Union[str, "CiscoConfParse", None] = None
+    ):
+        self.select(running_config)
+        # Only the global findings of this config can have failed yet
+        failed = any(f.status is Status.FAIL for f in self.global_findings or ())
+        if (self.fail_fast and failed) or not self.interface_checks():
+            self.interface_findings, self._interface_table = [], None
+            return
+        self.apply_interfaces(self.facts)
 
-    def check_mop(self, parse: CiscoConfParse):
-        mop_intfs_total, mop_intfs_success = 0, 0
-        cdp_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-        )
-        for cdp_obj in cdp_intfs:
-            if not cdp_obj.re_search_children(
-                r"^\sno\smop\senabled$"
-            ) and not cdp_obj.re_search_children(r"^\s+shutdown$"):
-                self.interface_table.add_row(f"{cdp_obj.text} no mop enabled", FAIL)
-            else:
-                mop_intfs_success += 1
-            mop_intfs_total += 1
-        try:
-            if mop_intfs_success / mop_intfs_total == 1:
-                self.interface_table.add_row(
-                    "no mop enabled (All access interfaces)", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(f"no mop enabled {ACC_INTF_VERIFY}", WARN)
+    def interface_checks(self) -> List[str]:
+        # Interface-level checks reporting at least one of the selected rules
+        return [
+            check
+            for check, rule_ids in INTERFACE_CHECKS.items()
+            if self.rules.selects(*rule_ids)
+        ]
 
-    def check_port_security(self, parse: CiscoConfParse):
-        ps_intfs_total, ps_intfs_pass = 0, 0
-        ps_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-        )
-        for ps_obj in ps_intfs:
-            if (
-                not ps_obj.re_search_children(
-                    r"^\sswitchport\sport-security|^\sip\sverify\ssource\sport\ssecurity$"
-                )
-                and not ps_obj.re_search_children(
-                    r"^\sswitchport\sport-security\smac-address\s"
-                )
-                and not ps_obj.re_search_children(r"^\s+shutdown$")
-            ):
-                self.interface_table.add_row(
-                    f"{ps_obj.text} switchport port-security mac-address", FAIL
-                )
-            else:
-                ps_intfs_pass += 1
-            ps_intfs_total += 1
-        try:
-            if ps_intfs_pass / ps_intfs_total == 1:
-                self.interface_table.add_row(
-                    "switchport port-security (All access interfaces)", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(
-                f"switchport port-security {ACC_INTF_VERIFY}", WARN
-            )
+    def apply_interfaces(self, facts: ConfigFacts):
+        self.interface_findings, self._interface_table = [], None
+        for check in self.interface_checks():
+            getattr(self, check)(facts)
+            if self.fail_fast and self.failed:
+                break
 
-    def check_stp_portfast(self, parse: CiscoConfParse):
-        if not bool(parse.find_objects(r"^spanning-tree\sportfast\sdefault$")):
-            stp_intfs_total, stp_intfs_pass = 0, 0
-            stp_intfs = parse.find_child_objects(
-                parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-            )
-            for stp_obj in stp_intfs:
-                if not stp_obj.re_search_children(
-                    r"^\sspanning-tree\sportfast\s\w+"
-                ) and not stp_obj.re_search_children(r"^\s+shutdown$"):
-                    self.interface_table.add_row(
-                        f"{stp_obj.text} spanning-tree portfast", FAIL
-                    )
-                else:
-                    stp_intfs_pass += 1
-                stp_intfs_total += 1
-            try:
-                if stp_intfs_pass / stp_intfs_total == 1:
-                    self.interface_table.add_row(
-                        "spanning-tree portfast (All access interfaces)", PASS
-                    )
-            except ZeroDivisionError:
-                self.interface_table.add_row(
-                    f"spanning-tree portfast {ACC_INTF_VERIFY}", WARN
-                )
-        else:
-            self.interface_table.add_row(
-                "spanning-tree portfast default ([cyan]Global[/cyan])",
-                PASS,
-            )
+    @property
+    def failed(self) -> bool:
+        """Whether any finding so far is a FAIL."""
+        return any(finding.status is Status.FAIL for finding in self.findings)
 
-    def check_stp_bpdu(self, parse: CiscoConfParse):
-        if not bool(
-            parse.find_objects(r"^spanning-tree\sportfast\sbpduguard\sdefault$")
-        ):
-            bpdu_intfs_total, bpdu_intfs_pass = 0, 0
-            bpdu_intfs = parse.find_child_objects(
-                parentspec=r"^interf", childspec=IS_ACCESS_PORT
-            )
-            for bpdu_obj in bpdu_intfs:
-                if not bpdu_obj.re_search_children(
-                    r"^\sspanning-tree\sbpduguard\senable$"
-                ) and not bpdu_obj.re_search_children(r"^\s+shutdown$"):
-                    self.interface_table.add_row(
-                        f"{bpdu_obj.text} spanning-tree bpduguard enable", FAIL
-                    )
-                else:
-                    bpdu_intfs_pass += 1
-                bpdu_intfs_total += 1
-            try:
-                if bpdu_intfs_pass / bpdu_intfs_total == 1:
-                    self.interface_table.add_row(
-                        "spanning-tree bpduguard enable (All access interfaces)", PASS
-                    )
-            except ZeroDivisionError:
-                self.interface_table.add_row(
-                    f"spanning-tree bpduguard {ACC_INTF_VERIFY}", WARN
-                )
-        else:
-            self.interface_table.add_row(
-                "spanning-tree portfast bpduguard default ([cyan]Global[/cyan])",
-                PASS,
-            )
+    @property
+    def facts(self) -> ConfigFacts:
+        # Interface and line vty facts, extracted once per loaded config
+        if self._facts is None:
+            blocks = self.block_verdicts()
+            if blocks is not None:
+                self._facts = blocks.facts
+                return self._facts
+            start = time.perf_counter()
+            self._facts = extract_line_facts(self.load(), self.rules)
+            if self.stats is not None:
+                self.stats.record("facts", time.perf_counter() - start)
+        return self._facts
 
-    def check_stp_root(self, parse: CiscoConfParse):
-        root_intfs_total, root_intfs_pass = 0, 0
-        root_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-        )
-        for root_obj in root_intfs:
-            if not root_obj.re_search_children(
-                r"^\sspanning-tree\sguard\sroot$|^\sspanning-tree\srootguard$"
-            ) and not root_obj.re_search_children(r"^\s+shutdown$"):
-                self.interface_table.add_row(
-                    f"{root_obj.text} spanning-tree guard root", FAIL
+    def block_object(self, block: BlockFacts):
+        # Typed ciscoconfparse2 object (e.g. IOSIntfLine) of a block, parsed
+        # on its own the first time it is asked for
+        return self.load().parse_block(block.linenum)
+
+    def select_objects(self, scope: int) -> list:
+        return [self.block_object(intf) for intf in self.facts.select(scope)]
+
+    def check_interfaces(self, facts: ConfigFacts, rule: InterfaceRule):
+        # Shared by the access and L3 interface checks
+        if rule.global_flag and facts.has(rule.global_flag):
+            self.add_interface(rule.rule_id, Status.PASS, rule.global_msg)
+            return
+        # Interfaces in scope and those failing, as bitsets over all of them
+        profiles = facts.profiles
+        selected = profiles.any(rule.scope)
+        failed = selected & profiles.where(rule.mask, rule.value)
+        for pos in iter_bits(failed):
+            intf = facts.interfaces[pos]
+            self.add_interface(
+                rule.rule_id, Status.FAIL, rule.fail_msg, intf.text, template=True
+            )
+        if not selected:
+            if rule.scope == ACCESS:
+                self.add_interface(
+                    rule.rule_id, Status.WARN, f"{rule.empty_msg} {ACC_INTF_VERIFY}"
                 )
             else:
-                root_intfs_pass += 1
-            root_intfs_total += 1
-        try:
-            if root_intfs_pass / root_intfs_total == 1:
-                self.interface_table.add_row(
-                    "spanning-tree guard root (All access interfaces)", PASS
+                self.add_interface(
+                    rule.rule_id, Status.FAIL, f"{rule.empty_msg} {L3_INTF_VERIFY}"
                 )
-        except ZeroDivisionError:
-            self.interface_table.add_row(
-                f"spanning-tree guard root {ACC_INTF_VERIFY}", WARN
-            )
+        elif not failed:
+            self.add_interface(rule.rule_id, Status.PASS, rule.pass_msg)
 
-    def check_cdp(self, parse: CiscoConfParse):
-        if not bool(parse.find_objects(r"^no\scdp\srun$")):
-            cdp_intfs_total, cdp_intfs_pass = 0, 0
-            cdp_intfs = parse.find_child_objects(
-                parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-            )
-            for cdp_obj in cdp_intfs:
-                if not cdp_obj.re_search_children(
-                    r"^\sno\scdp\senable$"
-                ) and not cdp_obj.re_search_children(r"^\sshutdown$"):
-                    self.interface_table.add_row(f"{cdp_obj.text} no cdp enable", FAIL)
-                else:
-                    cdp_intfs_pass += 1
-                cdp_intfs_total += 1
-            try:
-                if cdp_intfs_pass / cdp_intfs_total == 1:
-                    self.interface_table.add_row(
-                        "no cdp enable (All access interfaces)", PASS
-                    )
-            except ZeroDivisionError:
-                self.interface_table.add_row(f"no cdp enable {ACC_INTF_VERIFY}", WARN)
+    def check_vlan1(self, facts: ConfigFacts):
+        vlan1_intf = facts.vlan1
+        if not vlan1_intf:
+            self.add_interface(VLAN1_RULE, Status.NOT_FOUND, "'interface Vlan1'")
         else:
-            self.interface_table.add_row("no cdp run ([cyan]Global[/cyan])", PASS)
-
-    def check_lldp(self, parse: CiscoConfParse):
-        if not bool(parse.find_objects(r"^no\slldp\srun$")):
-            lldp_intfs_total, lldp_intfs_pass = 0, 0
-            lldp_intfs = parse.find_child_objects(
-                parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-            )
-            for lldp_obj in lldp_intfs:
-                if (
-                    not lldp_obj.re_search_children(r"^\sno\slldp\stransmit$")
-                    and not lldp_obj.re_search_children(r"^\sno\slldp\sreceive$")
-                    and not lldp_obj.re_search_children(r"^\sshutdown$")
-                ):
-                    self.interface_table.add_row(
-                        f"'{lldp_obj.text}' no lldp transmit/receive", FAIL
-                    )
+            msg = "'{0:s}' has no ip address and is shutdown"
+            for vlan1_obj in vlan1_intf:
+                if vlan1_obj.has(ENDS_SHUTDOWN) and vlan1_obj.has(NO_IP_ADDRESS):
+                    status = Status.PASS
                 else:
-                    lldp_intfs_pass += 1
-                lldp_intfs_total += 1
-            try:
-                if lldp_intfs_pass / lldp_intfs_total == 1:
-                    self.interface_table.add_row(
-                        "no lldp transmit/receive (All access interfaces)", PASS
-                    )
-            except ZeroDivisionError:
-                self.interface_table.add_row(
-                    f"no lldp transmit/receive {ACC_INTF_VERIFY}", WARN
+                    status = Status.FAIL
+                self.add_interface(
+                    VLAN1_RULE, status, msg, vlan1_obj.text, template=True
                 )
-        else:
-            self.interface_table.add_row("no lldp run ([cyan]Global[/cyan])", PASS)
 
-    def check_ip_src_verify(self, parse: CiscoConfParse):
-        src_verify_total, src_verify_pass = 0, 0
-        src_verify_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-        )
-        for src_verify_obj in src_verify_intfs:
-            if not src_verify_obj.re_search_children(
-                r"^\sip\sverify\ssource$"
-            ) and not src_verify_obj.re_search_children(r"^\sshutdown$"):
-                self.interface_table.add_row(
-                    f"'{src_verify_obj.text}' ip verify source", FAIL
-                )
-            else:
-                src_verify_pass += 1
-            src_verify_total += 1
-        try:
-            if src_verify_pass / src_verify_total == 1:
-                self.interface_table.add_row(
-                    "ip verify source (All access interfaces)", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(f"ip verify source {ACC_INTF_VERIFY}", WARN)
+    def check_mop(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I001"])
 
-    def check_sticky_mac(self, parse: CiscoConfParse):
-        mac_sticky_total, mac_stick_pass = 0, 0
-        mac_sticky_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=IS_ACCESS_PORT
-        )
-        for mac_sticky_obj in mac_sticky_intfs:
-            if (
-                not mac_sticky_obj.re_search_children(r"^\sswitchport\sport-security$")
-                and mac_sticky_obj.re_search_children(
-                    r"^\sswitchport\sport-security\smac-address\ssticky$"
-                )
-                and not mac_sticky_obj.re_search_children(r"^\sshutdown$")
-            ):
-                self.interface_table.add_row(
-                    f"'{mac_sticky_obj.text}' switchport port-security mac-address sticky",
-                    FAIL,
-                )
-            else:
-                mac_stick_pass += 1
-            mac_sticky_total += 1
-        try:
-            if mac_stick_pass / mac_sticky_total == 1:
-                self.interface_table.add_row(
-                    "switchport port-security (All access interfaces)", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(
-                f"switchport port-security mac-address sticky {ACC_INTF_VERIFY}", WARN
-            )
+    def check_port_security(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I002"])
 
-    # L3 interfaces
-    def check_arp_proxy(self, parse: CiscoConfParse):
-        if not bool(parse.find_objects(r"^ip\sarp\sproxy\sdisable$")):
-            arp_intfs_total, arp_intfs_pass = 0, 0
-            arp_intfs = parse.find_child_objects(
-                parentspec=r"^interface\s", childspec=r"^\sip\saddress\s"
-            )
-            for arp_obj in arp_intfs:
-                if not arp_obj.re_search_children(
-                    r"^\sno\sip\sproxy-arp$"
-                ) and not arp_obj.re_search_children(r"^\sshutdown$"):
-                    self.interface_table.add_row(
-                        f"'{arp_obj.text}' no ip proxy-arp", FAIL
-                    )
-                else:
-                    arp_intfs_pass += 1
-                arp_intfs_total += 1
-            try:
-                if arp_intfs_pass / arp_intfs_total == 1:
-                    self.interface_table.add_row(
-                        "no ip proxy-arp (All interfaces)", PASS
-                    )
-            except ZeroDivisionError:
-                self.interface_table.add_row(f"no ip proxy-arp {L3_INTF_VERIFY}", FAIL)
-        else:
-            self.interface_table.add_row(
-                "ip arp proxy disable ([cyan]Global[/cyan])", PASS
-            )
+    def check_stp_portfast(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I003"])
 
-    def check_ip_redirects(self, parse: CiscoConfParse):
-        redirect_intfs_total, redirect_intfs_pass = 0, 0
-        redirect_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=r"^\sip\saddress\s"
-        )
-        for redirect_obj in redirect_intfs:
-            if not redirect_obj.has_child_with(
-                r"^\sno\sip\sredirects$"
-            ) and not redirect_obj.has_child_with(r"^\sshutdown$"):
-                self.interface_table.add_row(
-                    f"'{redirect_obj.parent}' no ip redirects", FAIL
-                )
-            else:
-                redirect_intfs_pass += 1
-            redirect_intfs_total += 1
-        try:
-            if redirect_intfs_pass / redirect_intfs_total == 1:
-                self.interface_table.add_row("no ip redirects (All interfaces)", PASS)
-        except ZeroDivisionError:
-            self.interface_table.add_row(f"no ip redirects {L3_INTF_VERIFY}", FAIL)
+    def check_stp_bpdu(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I004"])
 
-    def check_route_cache(self, parse: CiscoConfParse):
-        rcache_intfs_total, rcache_intfs_pass = 0, 0
-        rcache_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=r"^\sip\saddress\s"
-        )
-        for rcache_obj in rcache_intfs:
-            if not rcache_obj.has_child_with(
-                r"^\sno\sip\sroute-cache$"
-            ) and not rcache_obj.has_child_with(r"^\sshutdown$"):
-                self.interface_table.add_row(
-                    f"'{rcache_obj.parent}' no ip route-cache", FAIL
-                )
-            else:
-                rcache_intfs_pass += 1
-            rcache_intfs_total += 1
-        try:
-            if rcache_intfs_pass / rcache_intfs_total == 1:
-                self.interface_table.add_row("no ip route-cache (All interfaces)", PASS)
-        except ZeroDivisionError:
-            self.interface_table.add_row(f"no ip route-cache {L3_INTF_VERIFY}", FAIL)
+    def check_stp_root(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I005"])
 
-    def check_directed_broadcast(self, parse: CiscoConfParse):
-        redirect_intfs_total, redirect_intfs_pass = 0, 0
-        redirect_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=r"^\sip\saddress\s"
-        )
-        for redirect_obj in redirect_intfs:
-            if not redirect_obj.re_search_children(
-                r"^\sno\sip\sdirected-broadcast$"
-            ) and not redirect_obj.re_search_children(r"^\sshutdown$"):
-                self.interface_table.add_row(
-                    f"'{redirect_obj.parent}' no ip directed-broadcast", FAIL
-                )
-            else:
-                redirect_intfs_pass += 1
-            redirect_intfs_total += 1
-        try:
-            if redirect_intfs_pass / redirect_intfs_total == 1:
-                self.interface_table.add_row(
-                    "ip directed-broadcast (All interfaces)", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(
-                f"ip directed-broadcast {L3_INTF_VERIFY}", FAIL
-            )
+    def check_cdp(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I006"])
 
-    def check_ip_unreachables(self, parse: CiscoConfParse):
-        unreachable_intfs_total, unreachable_intfs_pass = 0, 0
-        unreachable_intfs = parse.find_child_objects(
-            parentspec=r"^interface\s", childspec=r"^\sip\saddress\s"
-        )
-        for unreachable_obj in unreachable_intfs:
-            if unreachable_obj.re_search_children(
-                r"^\sip\sunreachables$"
-            ) and not unreachable_obj.re_search_children(r"^\sshutdown$"):
-                self.interface_table.add_row(
-                    f"'{unreachable_obj.parent}' no ip unreachables", FAIL
-                )
-            else:
-                unreachable_intfs_pass += 1
-            unreachable_intfs_total += 1
+    def check_lldp(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I007"])
 
-        try:
-            if unreachable_intfs_pass / unreachable_intfs_total == 1:
-                self.interface_table.add_row(
-                    "no ip unreachables ([cyan]All L3 interfaces[/cyan])", PASS
-                )
-        except ZeroDivisionError:
-            self.interface_table.add_row(f"no ip unreachables {L3_INTF_VERIFY}", FAIL)
+    def check_ip_src_verify(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I008"])
+
+    def check_sticky_mac(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I009"])
+
+    # L3 interfaces
+    def check_arp_proxy(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I010"])
+
+    def check_ip_redirects(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I011"])
 
-    def check_lines(self, parse: CiscoConfParse):
+    def check_route_cache(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I012"])
+
+    def check_directed_broadcast(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I013"])
+
+    def check_ip_unreachables(self, facts: ConfigFacts):
+        self.check_interfaces(facts, self.rules.interface_rules_by_id["I014"])
+
+    def check_lines(self, facts: ConfigFacts):
+        ssh, exec_timeout, logging_sync = (
+            self.rules.selects(rule_id)
+            for rule_id in (VTY_SSH_RULE, VTY_EXEC_TIMEOUT_RULE, VTY_LOGGING_SYNC_RULE)
+        )
         lines_total, lines_pass = 0, 0
-        lines = parse.find_objects(r"^line\svty\s")
         msg = "{0:s} --> transport input ssh"
-        for line_obj in lines:
-            if not line_obj.re_search_children(r"^\stransport\sinput\sssh$"):
-                self.interface_table.add_row(msg.format(line_obj.text), FAIL)
-            else:
-                self.interface_table.add_row(msg.format(line_obj.text), PASS)
+        for line_obj in facts.vty_lines:
+            target = line_obj.text
+            if ssh and not line_obj.has(TRANSPORT_SSH):
+                self.add_interface(
+                    VTY_SSH_RULE, Status.FAIL, msg, target, template=True
+                )
+            elif ssh:
+                self.add_interface(
+                    VTY_SSH_RULE, Status.PASS, msg, target, template=True
+                )
                 lines_pass += 1
-            if not line_obj.re_search_children(r"^\sexec-timeout\s10\s0$"):
-                self.interface_table.add_row(
-                    f"{line_obj.text} --> exec-timeout 10 0", FAIL
+            if exec_timeout and not line_obj.has(EXEC_TIMEOUT):
+                self.add_interface(
+                    VTY_EXEC_TIMEOUT_RULE,
+                    Status.FAIL,
+                    "{0} --> exec-timeout 10 0",
+                    target,
+                    template=True,
                 )
-            if not line_obj.re_search_children(r"^\slogging\ssynchronous$"):
-                self.interface_table.add_row(
-                    f"{line_obj.text} --> logging synchronous", RECOMMENDED
+            if logging_sync and not line_obj.has(LOGGING_SYNC):
+                self.add_interface(
+                    VTY_LOGGING_SYNC_RULE,
+                    Status.RECOMMENDED,
+                    "{0} --> logging synchronous",
+                    target,
+                    template=True,
                 )
             lines_total += 1
+        if not ssh:
+            return
         try:
             if lines_pass / lines_total == 1:
-                self.interface_table.add_row(
-                    "transport input ssh ([cyan]All VTY lines[/cyan])", PASS
+                self.add_interface(
+                    VTY_SSH_RULE,
+                    Status.PASS,
+                    "transport input ssh ([cyan]All VTY lines[/cyan])",
                 )
         except ZeroDivisionError:
-            self.interface_table.add_row("transport input ssh", FAIL)
+            self.add_interface(VTY_SSH_RULE, Status.FAIL, "transport input ssh")
+
+    def get_report(
+        self,
+        summary: bool = False,
+        failures_only: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        top: int = SUMMARY_TOP,
+    ):
+        """Print the global and interface-level audit tables.
 
-    def get_report(self):
-        if self.global_table is not None:
-            self.console.print(self.global_table)
-        if self.interface_table is not None:
-            self.console.print(self.interface_table)
+        A big switch has an interface row per failing port and rule; with
+        `summary` they are collapsed into a row per rule with the count and
+        the first `top` ports, `failures_only` only prints FAIL rows, and
+        `offset` / `limit` print one page of each table.
+        """
+        if not (summary or failures_only or offset or limit is not None):
+            tables = (self.global_table, self.interface_table)
+        else:
+            statuses = (Status.FAIL,) if failures_only else None
+            tables = tuple(
+                render_table(
+                    f"{self.hostname} {title}",
+                    findings,
+                    statuses,
+                    summary,
+                    offset,
+                    limit,
+                    top,
+                )
+                for title, findings in (
+                    ("Global Config Audit", self.global_findings),
+                    ("Interface-Level Audit", self.interface_findings),
+                )
+                if findings is not None
+            )
+        for table in tables:
+            if table is not None:
+                self.console.print(table)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import os
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .ingest import DeviceConfig
+from .report import WRITERS
+from .results import DeviceResult
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .cache import ResultCache
+    from .rulepack import RulePack
+
+ConfigSource = Union[str, "os.PathLike[str]", DeviceConfig]
+
+
+def is_config_text(source: ConfigSource) -> bool:
+    # A str holding a newline is config text, anything else is a file path
+    return isinstance(source, str) and "\n" in source
+
+
+def source_label(source: ConfigSource) -> str:
+    if isinstance(source, DeviceConfig):
+        return source.source
+    return "<text>" if is_config_text(source) else os.fspath(source)
+
+
+def read_source(source: ConfigSource, is_path: bool) -> str:
+    # Config text of `source`, read from a file if it is a path
+    if isinstance(source, DeviceConfig):
+        return source.text
+    if is_path:
+        return Path(source).read_text(encoding="utf-8")
+    return source
+
+
+def error_result(label: str, exc: BaseException) -> DeviceResult:
+    return DeviceResult(label, "", [], [], 0.0, f"{type(exc).__name__}: {exc}")
+
+
+def audit_config(
+    source: ConfigSource,
+    stats: bool = False,
+    rules: Optional["RulePack"] = None,
+    fail_fast: bool = False,
+    blocks: bool = False,
+) -> DeviceResult:
+    """Audit a single config (text or path) and return its findings.
+
+    With `blocks`, the config blocks seen by earlier audits of the process
+    are looked up in the rule pack's BlockStore, as batch runs do.
+    """
+    from . import DEFAULT_RULE_PACK, CiscoConfAudit
+
+    label = source_label(source)
+    rules = rules or DEFAULT_RULE_PACK
+    try:
+        audit = CiscoConfAudit(
+            stats=stats,
+            rules=rules,
+            fail_fast=fail_fast,
+            blocks=rules.blocks if blocks else None,
+        )
+        audit.global_config(read_source(source, not is_config_text(source)))
+        audit.interface_config()
+    except Exception as exc:
+        return error_result(label, exc)
+    return DeviceResult(
+        label,
+        audit.hostname,
+        audit.global_findings,
+        audit.interface_findings,
+        audit.parse_time,
+        stats=audit.stats.as_dict() if stats else None,
+    )
+
+
+def audit_function(
+    stats: bool = False,
+    rules: Optional["RulePack"] = None,
+    fail_fast: bool = False,
+    blocks: bool = True,
+) -> Callable[[ConfigSource], DeviceResult]:
+    # audit_config() with the options bound, picklable for the process pool;
+    # the audits of a batch share the block store of their process
+    return partial(
+        audit_config, stats=stats, rules=rules, fail_fast=fail_fast, blocks=blocks
+    )
+
+
+def default_chunksize(count: int, workers: int) -> int:
+    # Same heuristic as multiprocessing.Pool.map: ~4 chunks per worker
+    chunksize, extra = divmod(count, workers * 4)
+    return chunksize + 1 if extra else max(chunksize, 1)
+
+
+def audit_many(
+    sources: Iterable[ConfigSource],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    cache: Optional["ResultCache"] = None,
+    stats: bool = False,
+    rules: Optional["RulePack"] = None,
+    fail_fast: bool = False,
+) -> List[DeviceResult]:
+    """Audit many configs (texts or file paths) across a process pool.
+
+    Results come back in input order. A config that fails to load or parse
+    yields a DeviceResult with `error` set instead of aborting the batch.
+    With a ResultCache, configs audited before are answered from the cache.
+    With `stats`, each result carries the AuditStats timings of its audit.
+    `rules` is the RulePack to audit with, the default rules if None, and
+    `fail_fast` stops each audit at its first failing check.
+    """
+    if cache is not None:
+        return list(iter_audit(sources, workers, cache, stats, rules, fail_fast))
+    audit = audit_function(stats, rules, fail_fast)
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) < 2:
+        return [audit(source) for source in sources]
+    workers = min(workers, len(sources))
+    if chunksize is None:
+        chunksize = default_chunksize(len(sources), workers)
+    # multiprocessing is only imported for a pool, it is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(audit, sources, chunksize=chunksize))
+
+
+def _start_audit(
+    audit: Callable[[ConfigSource], DeviceResult],
+    source: ConfigSource,
+    executor: Optional["ProcessPoolExecutor"],
+    cache: Optional["ResultCache"],
+) -> Tuple[Optional[Tuple[str, str]], Union[DeviceResult, Future]]:
+    # Returns the (text, label) to cache the result under, and the result or
+    # the future of it
+    if cache is None:
+        if executor is None:
+            return None, audit(source)
+        return None, executor.submit(audit, source)
+    label = source_label(source)
+    try:
+        text = read_source(source, not is_config_text(source))
+    except Exception as exc:
+        return None, error_result(label, exc)
+    result = cache.get(text, label)
+    if result is not None:
+        return None, result
+    if executor is None:
+        return (text, label), audit(text)
+    return (text, label), executor.submit(audit, text)
+
+
+def _finish_audit(
+    started: Tuple[Optional[Tuple[str, str]], Union[DeviceResult, Future]],
+    cache: Optional["ResultCache"],
+) -> DeviceResult:
+    miss, result = started
+    if isinstance(result, Future):
+        result = result.result()
+    if miss is not None:
+        text, label = miss
+        result = result._replace(source=label)
+        cache.put(text, result)
+    return result
+
+
+def iter_audit(
+    sources: Iterable[ConfigSource],
+    workers: Optional[int] = None,
+    cache: Optional["ResultCache"] = None,
+    stats: bool = False,
+    rules: Optional["RulePack"] = None,
+    fail_fast: bool = False,
+) -> Iterator[DeviceResult]:
+    """Yield a DeviceResult per config, in input order, as audits finish.
+
+    Unlike audit_many(), `sources` is consumed lazily and only a few configs
+    per worker are in flight at once, so memory does not grow with the fleet.
+    Fail-fast results are partial, so they are neither read from nor written
+    to `cache`.
+    """
+    if fail_fast:
+        cache = None
+    if cache is not None:
+        if rules is None:
+            rules = cache.rules
+        elif rules.digest != cache.rules.digest:
+            raise ValueError("The cache holds results of a different RulePack")
+    audit = audit_function(stats, rules, fail_fast)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and cache is None:
+        for source in sources:
+            yield audit(source)
+        return
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for source in sources:
+            pending.append(_start_audit(audit, source, executor, cache))
+            if len(pending) >= workers * 4:
+                yield _finish_audit(pending.popleft(), cache)
+        while pending:
+            yield _finish_audit(pending.popleft(), cache)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def stream_report(
+    sources: Iterable[ConfigSource],
+    fp: IO[str],
+    fmt: str = "jsonl",
+    workers: Optional[int] = None,
+    cache: Optional["ResultCache"] = None,
+) -> int:
+    """Audit `sources` and write each device's findings to `fp` as it finishes.
+
+    `fmt` is "jsonl" (one JSON object per finding) or "csv". Returns the
+    number of devices written.
+    """
+    writer = WRITERS[fmt](fp)
+    for result in iter_audit(sources, workers, cache):
+        writer.write_result(result)
+    return writer.devices
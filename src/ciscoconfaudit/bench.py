@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+import argparse
+import gc
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Preset sizes: name -> (config lines, interfaces, line vty blocks)
+SIZES = {
+    "1k": (1_000, 48, 4),
+    "10k": (10_000, 500, 32),
+    "100k": (100_000, 5_000, 200),
+}
+METRICS = ("index", "global", "interface", "warm", "render", "peak_mib")
+
+# Global section modelled on examples/config-sample.txt
+GLOBAL_LINES = [
+    "version 17.9",
+    "service timestamps debug datetime msec",
+    "service timestamps log datetime msec",
+    "service call-home",
+    "platform qfp utilization monitor load 80",
+    "platform console virtual",
+    "!",
+    "hostname {hostname}",
+    "!",
+    "boot-start-marker",
+    "boot-end-marker",
+    "!",
+    "no logging console",
+    "no aaa new-model",
+    "clock timezone GMT -5 0",
+    "ip arp proxy disable",
+    "ip domain name example.com",
+    "login on-success log",
+    "!",
+    "username admin privilege 15 secret 9 $9$lgJxy7Ga.Th5FU$gocFhcHC/8pvixGr",
+    "!",
+    "spanning-tree mode rapid-pvst",
+    "spanning-tree extend system-id",
+    "!",
+    "ip forward-protocol nd",
+    "no ip http server",
+    "ip http secure-server",
+    "ip ssh version 2",
+    "!",
+]
+ACCESS_PORT = [
+    " description ACCESS PORT {idx}",
+    " switchport access vlan {vlan}",
+    " switchport mode access",
+    " switchport port-security",
+    " switchport port-security mac-address sticky",
+    " spanning-tree portfast edge",
+    " spanning-tree bpduguard enable",
+    " no cdp enable",
+    " ip verify source",
+]
+L3_PORT = [
+    " description UPLINK {idx}",
+    " ip address 10.{hi}.{lo}.1 255.255.255.252",
+    " no ip redirects",
+    " no ip unreachables",
+    " no ip proxy-arp",
+    " negotiation auto",
+]
+VTY_LINE = [
+    " exec-timeout 10 0",
+    " login local",
+    " length 0",
+    " transport input ssh",
+]
+
+
+def synthetic_config(
+    lines: int = 1_000, interfaces: int = 48, vty_lines: int = 4, seed: int = 0
+) -> str:
+    """Build an IOS running config of about `lines` lines.
+
+    Interfaces are a seeded mix of access ports and L3 uplinks, each missing
+    some hardening commands so every check has passing and failing ports.
+    Access-list entries pad the config up to the requested size.
+    """
+    rng = random.Random(seed)
+    out = [line.format(hostname=f"BENCH-{lines}") for line in GLOBAL_LINES]
+    out += ["interface Vlan1", " no ip address", " shutdown", "!"]
+    for idx in range(interfaces):
+        if rng.random() < 0.8:
+            out.append(f"interface GigabitEthernet1/0/{idx + 1}")
+            body = ACCESS_PORT
+        else:
+            out.append(f"interface TenGigabitEthernet1/1/{idx + 1}")
+            body = L3_PORT
+        for line in body:
+            if rng.random() < 0.85:
+                out.append(
+                    line.format(
+                        idx=idx, vlan=10 + idx % 90, hi=idx // 250, lo=idx % 250
+                    )
+                )
+        out.append("!")
+    filler = max(lines - len(out) - 5 * vty_lines - 1, 0)
+    out.append("ip access-list extended BENCH-ACL")
+    for idx in range(filler):
+        out.append(
+            f" {10 * (idx + 1)} permit tcp host 10.{idx // 65536 % 256}."
+            f"{idx // 256 % 256}.{idx % 256} any eq {rng.choice((22, 443, 830))}"
+        )
+    for idx in range(vty_lines):
+        out.append(f"line vty {idx * 5} {idx * 5 + 4}")
+        out += [line for line in VTY_LINE if rng.random() < 0.8]
+    out.append("end")
+    return "\n".join(out)
+
+
+def best_of(repeat: int, setup: Callable[[], object], run: Callable) -> float:
+    # Fastest of `repeat` runs of run(setup()); setup is not timed
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_config(running_config: str, repeat: int = 3) -> Dict[str, float]:
+    """Time each audit stage on `running_config` and measure peak memory."""
+    from rich.console import Console
+
+    from . import DEFAULT_RULE_PACK, CiscoConfAudit, _parse_cache
+
+    # Every stage but "warm" is timed without a block store, which would
+    # answer every repeat after the first
+    def fresh():
+        _parse_cache.clear()
+        return CiscoConfAudit()
+
+    def loaded():
+        audit = CiscoConfAudit()
+        audit.load(running_config)
+        return audit
+
+    def warmed():
+        # The config's blocks are known from an audit of the same config
+        store = DEFAULT_RULE_PACK.blocks
+        CiscoConfAudit(blocks=store).global_config(running_config)
+        return CiscoConfAudit(blocks=store)
+
+    def warm_audit(audit):
+        audit.global_config(running_config)
+        audit.interface_config()
+
+    def audited():
+        audit = loaded()
+        audit.global_config()
+        audit.interface_config()
+        audit.console = Console(file=io.StringIO(), record=True, tab_size=4)
+        return audit
+
+    def full_run():
+        audit = fresh()
+        audit.global_config(running_config)
+        audit.interface_config()
+        audit.console = Console(file=io.StringIO(), record=True, tab_size=4)
+        audit.get_report()
+
+    result = {
+        "lines": running_config.count("\n") + 1,
+        # load() builds the LineIndex, not a CiscoConfParse
+        "index": best_of(repeat, fresh, lambda audit: audit.load(running_config)),
+        "global": best_of(repeat, loaded, lambda audit: audit.global_config()),
+        "interface": best_of(repeat, loaded, lambda audit: audit.interface_config()),
+        "warm": best_of(repeat, warmed, warm_audit),
+        "render": best_of(repeat, audited, lambda audit: audit.get_report()),
+    }
+    gc.collect()
+    tracemalloc.start()
+    try:
+        full_run()
+        result["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    _parse_cache.clear()
+    DEFAULT_RULE_PACK.blocks.clear()
+    return result
+
+
+def run_benchmarks(
+    sizes: Sequence[str] = tuple(SIZES), repeat: int = 3, seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in sizes:
+        lines, interfaces, vty_lines = SIZES[size]
+        config = synthetic_config(lines, interfaces, vty_lines, seed)
+        results[size] = bench_config(config, repeat)
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 0.25,
+) -> List[str]:
+    """Metrics more than `tolerance` (a fraction) worse than the baseline."""
+    regressions = []
+    for size, metrics in results.items():
+        for metric in METRICS:
+            base = baseline.get(size, {}).get(metric)
+            if base and metrics[metric] > base * (1 + tolerance):
+                regressions.append(
+                    f"{size} {metric}: {metrics[metric]:.4f} > {base:.4f}"
+                    f" (+{metrics[metric] / base - 1:.0%})"
+                )
+    return regressions
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    rows = [
+        f"{'size':>6} {'lines':>8} {'index s':>9} {'global s':>9}"
+        f" {'intf s':>9} {'warm s':>9} {'render s':>9} {'peak MiB':>9}"
+    ]
+    for size, m in results.items():
+        rows.append(
+            f"{size:>6} {m['lines']:>8} {m['index']:>9.4f} {m['global']:>9.4f}"
+            f" {m['interface']:>9.4f} {m['warm']:>9.4f} {m['render']:>9.4f}"
+            f" {m['peak_mib']:>9.1f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ciscoconfaudit.bench",
+        description="Benchmark ciscoconfaudit on synthetic running configs",
+    )
+    parser.add_argument(
+        "--size", action="append", choices=tuple(SIZES), help="default: all sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results to compare")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown over the baseline (default: 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--dump-config",
+        metavar="SIZE",
+        choices=tuple(SIZES),
+        help="print the synthetic config of SIZE and exit",
+    )
+    args = parser.parse_args(argv)
+
+    if args.dump_config:
+        lines, interfaces, vty_lines = SIZES[args.dump_config]
+        print(synthetic_config(lines, interfaces, vty_lines, args.seed))
+        return 0
+    results = run_benchmarks(args.size or tuple(SIZES), args.repeat, args.seed)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            regressions = find_regressions(results, json.load(fp), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from typing import Iterable, List
+
+# Python ints used as bit arrays: bit n stands for item n of some sequence
+
+
+def bit_count(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def iter_bits(bits: int) -> List[int]:
+    """Positions of the set bits of `bits`, lowest first."""
+    digits = bin(bits)[:1:-1]
+    positions, pos = [], digits.find("1")
+    while pos != -1:
+        positions.append(pos)
+        pos = digits.find("1", pos + 1)
+    return positions
+
+
+def from_positions(positions: Iterable[int], size: int) -> int:
+    """The bitset of `positions`, all of which are below `size`."""
+    buf = bytearray((size + 7) // 8)
+    for pos in positions:
+        buf[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buf, "little")
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .facts import BlockFacts, ConfigFacts, facts_from_blocks
+from .lineindex import COMMENT_DELIMITER, LineIndex
+
+if TYPE_CHECKING:
+    from .rulepack import RulePack
+
+# Blocks remembered by each RulePack's store
+DEFAULT_BLOCK_STORE_SIZE = 65_536
+
+# (line within the block, header, fact flags) of an interface / line vty
+HeaderFacts = Tuple[int, str, int]
+
+
+class BlockStore(object):
+    """LRU map of config block digests to what an audit found in them.
+
+    Devices of a fleet share most of their configuration (AAA, line vty,
+    banners, SNMP, NTP, port templates), so what the rules find in a block is
+    looked up by the digest of its text before indexing and matching it.
+    Each RulePack has its own store, which lives as long as the process, so
+    every audit of a batch run (or of a pool worker) reuses the blocks seen
+    before and fleet audits cost what their distinct blocks cost.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_BLOCK_STORE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        # The audit server's handler threads share the stores
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def digest(kind: str, lines: Sequence[str]) -> bytes:
+        """Content address of `lines`, audited as a block of `kind`."""
+        digest = hashlib.blake2b(kind.encode("utf-8"), digest_size=16)
+        digest.update("\n".join(lines).encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: object):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+class BlockVerdict(NamedTuple):
+    """What the rules of a pack found in one block of a config."""
+
+    # Bitset of the global rules matched, and the global fact flags
+    rules: int
+    flags: int
+    # First top-level `hostname`, if any
+    hostname: Optional[str]
+    interfaces: Tuple[HeaderFacts, ...]
+    vty_lines: Tuple[HeaderFacts, ...]
+
+
+class ConfigBlocks(NamedTuple):
+    """Global rule matches, hostname and facts of a config, from its blocks."""
+
+    matches: List[bool]
+    hostname: Optional[str]
+    facts: ConfigFacts
+
+
+def split_blocks(lines: List[str]) -> Iterator[Tuple[int, int]]:
+    """(start, end) line ranges of the config, each ending at a `!` line.
+
+    IOS writes a `!` between top-level blocks and sections, so a block is a
+    top-level line with its children (an interface, line vty, a banner) or
+    a section of single lines (AAA, SNMP, NTP).
+    """
+    start, count = 0, len(lines)
+    while start < count:
+        try:
+            end = lines.index(COMMENT_DELIMITER, start) + 1
+        except ValueError:
+            end = count
+        yield start, end
+        start = end
+
+
+def starts_at_root(lines: Sequence[str]) -> bool:
+    # Whether the first config line is a top-level line with nothing indented
+    # before it; then no line of the block can be the child of a line above
+    for text in lines:
+        if text != text.lstrip():
+            return False
+        if text and text[0] != COMMENT_DELIMITER:
+            return True
+    return True
+
+
+def block_verdict(
+    lines: Sequence[str], pack: "RulePack", store: BlockStore
+) -> Union[BlockVerdict, bool]:
+    """Audit one block on its own, False if it depends on the lines around it."""
+    if not starts_at_root(lines):
+        return False
+    index = LineIndex(lines)
+    if not index.closed:
+        return False
+    rules = 0
+    for idx, matched in enumerate(pack.engine.match(lines)):
+        if matched:
+            rules |= 1 << idx
+    flags = pack.global_matcher.search(lines)
+    facts = facts_from_blocks(lines, index.child_texts, pack, flags, store=store)
+    return BlockVerdict(
+        rules,
+        flags,
+        index.re_match_iter_typed(pack.hostname_re.pattern, default=None),
+        tuple((block.linenum, block.text, block.flags) for block in facts.interfaces),
+        tuple((block.linenum, block.text, block.flags) for block in facts.vty_lines),
+    )
+
+
+def config_blocks(
+    lines: List[str], pack: "RulePack", store: BlockStore
+) -> Optional[ConfigBlocks]:
+    """Audit `lines` block by block, reusing the verdicts of known blocks.
+
+    A block is only audited on its own when every banner and macro in it
+    ends within it and it starts at a top-level line, so its verdict is the
+    same wherever it appears. Returns None for configs with other blocks,
+    which have to be indexed as a whole.
+    """
+    rules = flags = 0
+    hostname = None
+    interfaces: List[BlockFacts] = []
+    vty_lines: List[BlockFacts] = []
+    for start, end in split_blocks(lines):
+        block = lines[start:end]
+        key = store.digest("config", block)
+        verdict = store.get(key)
+        if verdict is None:
+            verdict = block_verdict(block, pack, store)
+            store.put(key, verdict)
+        if verdict is False:
+            return None
+        rules |= verdict.rules
+        flags |= verdict.flags
+        if hostname is None:
+            hostname = verdict.hostname
+        for found, headers in (
+            (interfaces, verdict.interfaces),
+            (vty_lines, verdict.vty_lines),
+        ):
+            found.extend(
+                BlockFacts(text, block_flags, start + linenum)
+                for linenum, text, block_flags in headers
+            )
+    matches = [bool(rules >> idx & 1) for idx in range(len(pack.engine.rules))]
+    return ConfigBlocks(matches, hostname, ConfigFacts(flags, interfaces, vty_lines))
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import List, Optional, Sequence
+
+from .results import DeviceResult, Finding
+from .rulepack import DEFAULT_RULE_PACK, RulePack
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "ciscoconfaudit",
+    "results.sqlite3",
+)
+# Stored results are evicted, least recently used first, above this size
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    ruleset TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def ruleset_digest(rules: RulePack = DEFAULT_RULE_PACK) -> str:
+    """SHA-256 of everything that decides the findings of a config."""
+    from . import __version__
+
+    ruleset = (__version__, rules.digest)
+    return hashlib.sha256(repr(ruleset).encode("utf-8")).hexdigest()
+
+
+def dump_findings(result: DeviceResult) -> str:
+    # Per-port findings keep their message template (see Finding.as_row())
+    return json.dumps(
+        [
+            [finding.as_row() for finding in findings]
+            for findings in (result.global_findings, result.interface_findings)
+        ]
+    )
+
+
+def load_findings(data: str) -> List[List[Finding]]:
+    return [
+        [Finding.from_row(row) for row in findings] for findings in json.loads(data)
+    ]
+
+
+class ResultCache(object):
+    """SQLite cache of audit results keyed by config and rule set.
+
+    Entries are keyed by the SHA-256 of the running config together with
+    ruleset_digest(), so upgrading ciscoconfaudit or changing a rule never
+    serves stale results. A hit is answered without parsing the config.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rules: RulePack = DEFAULT_RULE_PACK,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rules = rules
+        self.ruleset = ruleset_digest(rules)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, running_config: str) -> str:
+        from . import config_digest
+
+        return f"{config_digest(running_config)}:{self.ruleset}"
+
+    def get(self, running_config: str, source: str = "") -> Optional[DeviceResult]:
+        key = self.key(running_config)
+        row = self.db.execute(
+            "SELECT hostname, findings FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        with self.db:
+            self.db.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        self.hits += 1
+        global_findings, interface_findings = load_findings(row[1])
+        return DeviceResult(source, row[0], global_findings, interface_findings, 0.0)
+
+    def put(self, running_config: str, result: DeviceResult):
+        if result.error:
+            return
+        findings = dump_findings(result)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(running_config),
+                    self.ruleset,
+                    result.hostname,
+                    findings,
+                    len(findings),
+                    time.time(),
+                ),
+            )
+        self.evict()
+
+    def size(self) -> int:
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[
+            0
+        ]
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Drop least recently used entries until the cache fits `max_bytes`."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.size() - max_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        with self.db:
+            rows = self.db.execute(
+                "SELECT key, size FROM results ORDER BY accessed"
+            ).fetchall()
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+                excess -= size
+                evicted += 1
+        return evicted
+
+    def invalidate(self, stale_only: bool = False) -> int:
+        """Drop every entry, or with `stale_only` those of other rule sets."""
+        with self.db:
+            if stale_only:
+                cursor = self.db.execute(
+                    "DELETE FROM results WHERE ruleset != ?", (self.ruleset,)
+                )
+            else:
+                cursor = self.db.execute("DELETE FROM results")
+        self.db.execute("VACUUM")
+        return cursor.rowcount
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ciscoconfaudit.cache",
+        description="Inspect or invalidate the ciscoconfaudit result cache",
+    )
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH)
+    parser.add_argument(
+        "command",
+        choices=("stats", "clear", "prune"),
+        help="clear drops every entry, prune only those of older rule sets",
+    )
+    args = parser.parse_args(argv)
+    with ResultCache(args.path) as cache:
+        if args.command == "stats":
+            print(f"{args.path}: {len(cache)} entries, {cache.size()} bytes")
+        else:
+            dropped = cache.invalidate(stale_only=args.command == "prune")
+            print(f"{args.path}: dropped {dropped} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
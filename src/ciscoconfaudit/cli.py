@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+from typing import IO, Iterable, Iterator, List, Optional, Sequence
+
+from .ingest import SPLIT_MODES, DeviceConfig, iter_configs
+from .report import WRITERS
+from .results import DeviceResult, Status
+
+FORMATS = (*WRITERS, "table")
+
+
+def expand_paths(patterns: Iterable[str]) -> Iterator[str]:
+    """Paths named by `patterns`, with globs ("configs/**/*.txt") expanded."""
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No file matches {pattern!r}")
+            yield from matches
+        elif os.path.exists(pattern):
+            yield pattern
+        else:
+            raise FileNotFoundError(f"No such file or directory: {pattern!r}")
+
+
+class Progress(object):
+    """Devices audited and throughput, redrawn on one line of `fp`."""
+
+    def __init__(self, fp: IO[str], enabled: bool = True, interval: float = 0.2):
+        self.fp = fp
+        self.enabled = enabled
+        self.interval = interval
+        self.devices = 0
+        self.lines = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self.shown = self.start
+
+    def update(self, result: DeviceResult, lines: int):
+        self.devices += 1
+        self.lines += lines
+        if result.error or any(f.status is Status.FAIL for f in result.findings):
+            self.failed += 1
+        now = time.perf_counter()
+        if self.enabled and now - self.shown >= self.interval:
+            self.shown = now
+            self.fp.write(f"\r{self.status(now)}")
+            self.fp.flush()
+
+    def status(self, now: float) -> str:
+        elapsed = max(now - self.start, 1e-9)
+        return (
+            f"{self.devices} devices ({self.failed} failing), {self.lines} lines"
+            f" in {elapsed:.1f}s: {self.devices / elapsed:.1f} devices/s,"
+            f" {self.lines / elapsed:.0f} lines/s"
+        )
+
+    def finish(self):
+        if self.enabled:
+            self.fp.write(f"\r{self.status(time.perf_counter())}\n")
+            self.fp.flush()
+
+
+def render_result(console, result: DeviceResult, **options):
+    # `options` of render_table(): statuses, summary, offset, limit, top
+    from .report import render_table
+
+    if result.error:
+        console.print(f"[bold red]{result.source}: {result.error}[/bold red]")
+        return
+    for title, findings in (
+        ("Global Config Audit", result.global_findings),
+        ("Interface-Level Audit", result.interface_findings),
+    ):
+        if findings:
+            console.print(
+                render_table(f"{result.hostname} {title}", findings, **options)
+            )
+
+
+def split_items(values: Optional[List[str]]) -> List[str]:
+    # `-i ssh,aaa -i G001` -> ["ssh", "aaa", "G001"]
+    return [item for value in values or () for item in value.split(",") if item]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ciscoconfaudit",
+        description="Audit Cisco IOS / IOS-XE running configs against the"
+        " hardening guide",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="config files, directories, archives or globs (quote them)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="parallel audit processes (default: one per CPU)",
+    )
+    parser.add_argument("-f", "--format", choices=FORMATS, default="jsonl")
+    parser.add_argument(
+        "-o", "--output", default="-", help="file to write to (default: stdout)"
+    )
+    table = parser.add_argument_group("table format")
+    table.add_argument(
+        "--summary",
+        action="store_true",
+        help="one row per rule for the interfaces / lines failing it",
+    )
+    table.add_argument(
+        "--failures-only", action="store_true", help="only show FAIL rows"
+    )
+    table.add_argument(
+        "--limit", type=int, metavar="ROWS", help="show at most ROWS rows per table"
+    )
+    parser.add_argument(
+        "--split",
+        choices=SPLIT_MODES,
+        default="end",
+        help="end: a file may hold several configs, each ending at `end`",
+    )
+    parser.add_argument(
+        "-i",
+        "--include",
+        action="append",
+        metavar="RULES",
+        help="only audit these rule ids, id globs or tags (comma separated)",
+    )
+    parser.add_argument(
+        "-x", "--exclude", action="append", metavar="RULES", help="skip these rules"
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop each device's audit at its first failing check",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="reuse results of unchanged configs from a result cache",
+    )
+    parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="show progress on stderr (default: when stderr is a terminal)",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Exit status 0 when every device passed, 1 when any failed or errored."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    rules = None
+    if args.include or args.exclude:
+        from .rulepack import DEFAULT_RULE_PACK
+
+        try:
+            rules = DEFAULT_RULE_PACK.select(
+                split_items(args.include), split_items(args.exclude)
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+    cache = None
+    if args.cache is not None:
+        from .cache import DEFAULT_CACHE_PATH, ResultCache
+        from .rulepack import DEFAULT_RULE_PACK
+
+        cache = ResultCache(
+            args.cache or DEFAULT_CACHE_PATH, rules=rules or DEFAULT_RULE_PACK
+        )
+    try:
+        paths = list(expand_paths(args.paths))
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+
+    from .batch import iter_audit
+
+    # Line counts of the configs handed to iter_audit(), which yields its
+    # results in the same order
+    line_counts = deque()
+
+    def counted() -> Iterator[DeviceConfig]:
+        for path in paths:
+            for config in iter_configs(path, args.split):
+                line_counts.append(config.text.count("\n") + 1)
+                yield config
+
+    show = sys.stderr.isatty() if args.progress is None else args.progress
+    progress = Progress(sys.stderr, show)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        if args.format == "table":
+            from rich.console import Console
+
+            console = Console(file=out)
+            write = partial(
+                render_result,
+                console,
+                statuses=(Status.FAIL,) if args.failures_only else None,
+                summary=args.summary,
+                limit=args.limit,
+            )
+        else:
+            write = WRITERS[args.format](out).write_result
+        results = iter_audit(
+            counted(), args.jobs or None, cache, rules=rules, fail_fast=args.fail_fast
+        )
+        for result in results:
+            write(result)
+            progress.update(result, line_counts.popleft())
+    except BrokenPipeError:
+        # Output piped into e.g. `head`; keep Python from complaining again
+        # when it flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        progress.finish()
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Union
+
+from .batch import ConfigSource, audit_function, error_result, read_source
+from .ingest import DeviceConfig
+from .results import DeviceResult
+
+# Netmiko style device dict: {"device_type": ..., "host": ..., ...}
+Device = Mapping[str, object]
+# Returns the running config of `device`, giving up after `timeout` seconds
+Transport = Callable[[Device, float], str]
+
+RUNNING_CONFIG_CMD = "show running-config full"
+
+
+def device_label(device: Device) -> str:
+    return str(device.get("host") or device.get("ip") or "<device>")
+
+
+def netmiko_fetch(device: Device, timeout: float) -> str:
+    from netmiko import ConnectHandler
+
+    with ConnectHandler(**{"conn_timeout": timeout, **device}) as conn:
+        if not conn.check_enable_mode():
+            conn.enable()
+        return conn.send_command(RUNNING_CONFIG_CMD, read_timeout=timeout)
+
+
+class FakeTransport(object):
+    """Offline stand-in for netmiko_fetch() that serves canned configs.
+
+    `configs` is a config served for every device, or a mapping of device
+    label to config. A config is its text, however short (a device reply
+    such as "% Authorization failed"), or an os.PathLike of a file holding
+    it. `delay` simulates the SSH round trip.
+    """
+
+    def __init__(
+        self,
+        configs: Union[ConfigSource, Mapping[str, ConfigSource]],
+        delay: float = 0.0,
+    ):
+        if isinstance(configs, Mapping):
+            self.configs: Optional[Dict[str, str]] = {
+                label: read_source(config, not isinstance(config, str))
+                for label, config in configs.items()
+            }
+            self.config = None
+        else:
+            self.configs = None
+            self.config = read_source(configs, not isinstance(configs, str))
+        self.delay = delay
+
+    def __call__(self, device: Device, timeout: float) -> str:
+        label = device_label(device)
+        if self.configs is not None and label not in self.configs:
+            raise ConnectionError(f"{label}: connection refused")
+        time.sleep(min(self.delay, timeout))
+        if self.delay > timeout:
+            raise TimeoutError(f"{label}: timed out after {timeout:g}s")
+        return self.config if self.configs is None else self.configs[label]
+
+
+def collect_audit(
+    devices: Iterable[Device],
+    fetch: Transport = netmiko_fetch,
+    concurrency: int = 8,
+    timeout: float = 60.0,
+    audit_workers: Optional[int] = 1,
+) -> Iterator[DeviceResult]:
+    """Fetch the running config of `devices` concurrently and audit them.
+
+    At most `concurrency` fetches run at once. Each config is audited as soon
+    as it arrives, in-process or on a pool of `audit_workers` processes, while
+    the remaining fetches are still running. A device whose fetch takes longer
+    than `timeout` seconds is reported with an error; results are yielded in
+    completion order.
+    """
+    devices = list(devices)
+    started: Dict[int, float] = {}
+
+    def fetch_one(index: int) -> str:
+        started[index] = time.monotonic()
+        return fetch(devices[index], timeout)
+
+    audit = audit_function()
+    auditor: Optional[Executor] = None
+    if audit_workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        auditor = ProcessPoolExecutor(max_workers=audit_workers or os.cpu_count())
+    fetcher = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        fetches: Dict[Future, int] = {
+            fetcher.submit(fetch_one, index): index for index in range(len(devices))
+        }
+        audits: Dict[Future, int] = {}
+        while fetches or audits:
+            done, _ = wait(
+                list(fetches) + list(audits),
+                timeout=min(timeout, 1.0) if fetches else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                if future in audits:
+                    index = audits.pop(future)
+                    label = device_label(devices[index])
+                    try:
+                        yield future.result()
+                    except Exception as exc:
+                        yield error_result(label, exc)
+                    continue
+                index = fetches.pop(future)
+                label = device_label(devices[index])
+                try:
+                    config = future.result()
+                except Exception as exc:
+                    yield error_result(label, exc)
+                    continue
+                # Fetched text, never a path, however short the reply was
+                config = DeviceConfig(label, config)
+                if auditor is None:
+                    yield audit(config)
+                else:
+                    audits[auditor.submit(audit, config)] = index
+            # Give up on fetches that overran their timeout; the transport
+            # thread is left to finish on its own
+            now = time.monotonic()
+            for future, index in list(fetches.items()):
+                # A fetch done by now is collected by the next wait()
+                if future.done():
+                    continue
+                if index in started and now - started[index] > timeout:
+                    del fetches[future]
+                    label = device_label(devices[index])
+                    yield error_result(
+                        label, TimeoutError(f"{label}: timed out after {timeout:g}s")
+                    )
+    finally:
+        fetcher.shutdown(wait=False, cancel_futures=True)
+        if auditor is not None:
+            auditor.shutdown(wait=False, cancel_futures=True)
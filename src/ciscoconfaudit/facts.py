@@ -0,0 +1,515 @@
+# -*- coding: utf-8 -*-
+import re
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .bits import from_positions
+from .lineindex import LineIndex
+from .rules import TokenIndex
+
+if TYPE_CHECKING:
+    from ciscoconfparse2 import CiscoConfParse
+
+    from .blockstore import BlockStore
+    from .rulepack import RulePack
+
+HOSTNAME = r"^hostname\s+(\S+)"
+IS_INTERFACE = r"^interface\s"
+IS_VLAN1 = r"^interface\s[vV]lan1$"
+IS_VTY_LINE = r"^line\svty\s"
+
+# Interface facts, one bit per child line pattern
+ACCESS = 1 << 0
+L3 = 1 << 1
+SHUTDOWN = 1 << 2
+ANY_SHUTDOWN = 1 << 3
+NO_MOP = 1 << 4
+PORT_SECURITY = 1 << 5
+PORT_SECURITY_MAC = 1 << 6
+PORT_SECURITY_ONLY = 1 << 7
+STICKY_MAC = 1 << 8
+PORTFAST = 1 << 9
+BPDUGUARD = 1 << 10
+ROOT_GUARD = 1 << 11
+NO_CDP = 1 << 12
+NO_LLDP_TRANSMIT = 1 << 13
+NO_LLDP_RECEIVE = 1 << 14
+IP_VERIFY_SOURCE = 1 << 15
+NO_PROXY_ARP = 1 << 16
+NO_REDIRECTS = 1 << 17
+NO_ROUTE_CACHE = 1 << 18
+NO_DIRECTED_BROADCAST = 1 << 19
+IP_UNREACHABLES = 1 << 20
+# Looser patterns used by the Vlan1 check
+ENDS_SHUTDOWN = 1 << 21
+NO_IP_ADDRESS = 1 << 22
+
+INTERFACE_FACTS: Tuple[Tuple[int, str], ...] = (
+    (ACCESS, r"^\sswitchport\smode\saccess$"),
+    (L3, r"^\sip\saddress\s"),
+    (SHUTDOWN, r"^\sshutdown$"),
+    (ANY_SHUTDOWN, r"^\s+shutdown$"),
+    (NO_MOP, r"^\sno\smop\senabled$"),
+    (
+        PORT_SECURITY,
+        r"^\sswitchport\sport-security|^\sip\sverify\ssource\sport\ssecurity$",
+    ),
+    (PORT_SECURITY_MAC, r"^\sswitchport\sport-security\smac-address\s"),
+    (PORT_SECURITY_ONLY, r"^\sswitchport\sport-security$"),
+    (STICKY_MAC, r"^\sswitchport\sport-security\smac-address\ssticky$"),
+    (PORTFAST, r"^\sspanning-tree\sportfast\s\w+"),
+    (BPDUGUARD, r"^\sspanning-tree\sbpduguard\senable$"),
+    (ROOT_GUARD, r"^\sspanning-tree\sguard\sroot$|^\sspanning-tree\srootguard$"),
+    (NO_CDP, r"^\sno\scdp\senable$"),
+    (NO_LLDP_TRANSMIT, r"^\sno\slldp\stransmit$"),
+    (NO_LLDP_RECEIVE, r"^\sno\slldp\sreceive$"),
+    (IP_VERIFY_SOURCE, r"^\sip\sverify\ssource$"),
+    (NO_PROXY_ARP, r"^\sno\sip\sproxy-arp$"),
+    (NO_REDIRECTS, r"^\sno\sip\sredirects$"),
+    (NO_ROUTE_CACHE, r"^\sno\sip\sroute-cache$"),
+    (NO_DIRECTED_BROADCAST, r"^\sno\sip\sdirected-broadcast$"),
+    (IP_UNREACHABLES, r"^\sip\sunreachables$"),
+    (ENDS_SHUTDOWN, r"\sshutdown$"),
+    (NO_IP_ADDRESS, r"\sno\sip\saddress$"),
+)
+
+# Ids of the checks that are not part of INTERFACE_RULES
+VLAN1_RULE = "I015"
+VTY_SSH_RULE = "V001"
+VTY_EXEC_TIMEOUT_RULE = "V002"
+VTY_LOGGING_SYNC_RULE = "V003"
+# What each of those checks is about, as InterfaceRule.pass_msg is for rules
+CHECK_TITLES = {
+    VLAN1_RULE: "no ip address and shutdown (interface Vlan1)",
+    VTY_SSH_RULE: "transport input ssh (All VTY lines)",
+    VTY_EXEC_TIMEOUT_RULE: "exec-timeout 10 0 (All VTY lines)",
+    VTY_LOGGING_SYNC_RULE: "logging synchronous (All VTY lines)",
+}
+
+# line vty facts
+TRANSPORT_SSH = 1 << 0
+EXEC_TIMEOUT = 1 << 1
+LOGGING_SYNC = 1 << 2
+
+VTY_FACTS: Tuple[Tuple[int, str], ...] = (
+    (TRANSPORT_SSH, r"^\stransport\sinput\sssh$"),
+    (EXEC_TIMEOUT, r"^\sexec-timeout\s10\s0$"),
+    (LOGGING_SYNC, r"^\slogging\ssynchronous$"),
+)
+
+# Global facts that settle an interface check for every interface
+PORTFAST_DEFAULT = 1 << 0
+BPDUGUARD_DEFAULT = 1 << 1
+NO_CDP_RUN = 1 << 2
+NO_LLDP_RUN = 1 << 3
+ARP_PROXY_DISABLE = 1 << 4
+
+GLOBAL_FACTS: Tuple[Tuple[int, str], ...] = (
+    (PORTFAST_DEFAULT, r"^spanning-tree\sportfast\sdefault$"),
+    (BPDUGUARD_DEFAULT, r"^spanning-tree\sportfast\sbpduguard\sdefault$"),
+    (NO_CDP_RUN, r"^no\scdp\srun$"),
+    (NO_LLDP_RUN, r"^no\slldp\srun$"),
+    (ARP_PROXY_DISABLE, r"^ip\sarp\sproxy\sdisable$"),
+)
+
+
+class FlagMatcher(object):
+    """Fold the lines of a block into a bitset of the facts they contain."""
+
+    def __init__(self, facts: Sequence[Tuple[int, str]]):
+        self.flags = [flag for flag, _ in facts]
+        self.index = TokenIndex([pattern for _, pattern in facts])
+
+    def match(self, lines: Iterable[str]) -> int:
+        flags, matches = 0, self.index.matches
+        for line in lines:
+            for idx in matches(line):
+                flags |= self.flags[idx]
+        return flags
+
+    def match_lines(self, lines: Iterable[str], line_flags: Dict[str, int]) -> int:
+        # match() with the flags of each distinct line kept in `line_flags`
+        flags = 0
+        for line in lines:
+            found = line_flags.get(line)
+            if found is None:
+                found = line_flags[line] = self.match((line,))
+            flags |= found
+        return flags
+
+    def search(self, lines: Iterable[str]) -> int:
+        flags = 0
+        for flag, matched in zip(self.flags, self.index.search(lines)):
+            if matched:
+                flags |= flag
+        return flags
+
+
+_vlan1_re = re.compile(IS_VLAN1)
+
+
+class BlockFacts(object):
+    """Header text of an `interface` or `line vty` block and its fact bits."""
+
+    __slots__ = ("text", "flags", "linenum")
+
+    def __init__(self, text: str, flags: int, linenum: int = -1):
+        self.text = text
+        self.flags = flags
+        # Index of the header line in the config
+        self.linenum = linenum
+
+    def has(self, flag: int) -> bool:
+        return bool(self.flags & flag)
+
+    def __repr__(self):
+        return f"<BlockFacts {self.text!r} flags={self.flags:#x}>"
+
+
+class FactProfiles(object):
+    """The facts of a list of blocks, grouped into profiles.
+
+    Blocks with the same flags (ports configured from one template) share a
+    profile holding the bitset of their positions, so a rule is evaluated
+    once per profile and its verdict applies to every block of the profile
+    with a single int OR.
+    """
+
+    __slots__ = ("size", "profiles")
+
+    def __init__(self, blocks: Sequence[BlockFacts]):
+        self.size = len(blocks)
+        positions: Dict[int, List[int]] = {}
+        for pos, block in enumerate(blocks):
+            found = positions.get(block.flags)
+            if found is None:
+                positions[block.flags] = [pos]
+            else:
+                found.append(pos)
+        # Flags -> bitset of the blocks that have exactly those flags
+        self.profiles: Dict[int, int] = {
+            flags: from_positions(found, self.size)
+            for flags, found in positions.items()
+        }
+
+    def any(self, flags: int) -> int:
+        """Blocks with at least one of `flags`."""
+        selected = 0
+        for profile, blocks in self.profiles.items():
+            if profile & flags:
+                selected |= blocks
+        return selected
+
+    def where(self, mask: int, value: int) -> int:
+        """Blocks whose `flags & mask == value`."""
+        selected = 0
+        for profile, blocks in self.profiles.items():
+            if profile & mask == value:
+                selected |= blocks
+        return selected
+
+
+class ConfigFacts(object):
+    __slots__ = ("flags", "interfaces", "vty_lines", "_profiles")
+
+    def __init__(
+        self, flags: int, interfaces: List[BlockFacts], vty_lines: List[BlockFacts]
+    ):
+        self.flags = flags
+        self.interfaces = interfaces
+        self.vty_lines = vty_lines
+        self._profiles: Optional[FactProfiles] = None
+
+    def has(self, flag: int) -> bool:
+        return bool(self.flags & flag)
+
+    @property
+    def profiles(self) -> FactProfiles:
+        # Interface facts by profile, built the first time a rule needs them
+        if self._profiles is None:
+            self._profiles = FactProfiles(self.interfaces)
+        return self._profiles
+
+    @property
+    def vlan1(self) -> List[BlockFacts]:
+        return [intf for intf in self.interfaces if _vlan1_re.search(intf.text)]
+
+    def select(self, scope: int) -> List[BlockFacts]:
+        return [intf for intf in self.interfaces if intf.flags & scope]
+
+
+def facts_from_blocks(
+    lines: Sequence[str],
+    children: Callable[[int], Iterable[str]],
+    pack: "RulePack",
+    global_flags: Optional[int] = None,
+    memo: Optional[MutableMapping[Tuple[str, Tuple[str, ...]], int]] = None,
+    store: Optional["BlockStore"] = None,
+) -> ConfigFacts:
+    """Collect interface, line vty and global facts from the config `lines`.
+
+    `children(idx)` returns the texts of the direct children of line `idx`,
+    and `pack` provides the compiled fact patterns.
+    With `memo`, the flags of each block are stored under (header, children)
+    and looked up there first, so unchanged blocks are not matched again.
+    With a BlockStore, the flags of each distinct body are looked up by its
+    digest, so bodies seen in earlier configs are not matched again either.
+
+    Ports configured from one template have identical bodies (the child
+    lines, without the header), so the flags of each distinct body are
+    computed once, matching each distinct child line once, and shared by
+    every block with that body.
+    """
+    interfaces, vty_lines = [], []
+    # Header pattern, fact matcher and blocks of each kind of block, with the
+    # flags of its distinct child lines and of its distinct bodies
+    kinds = (
+        ("interface", pack.interface_re, pack.interface_matcher, interfaces, {}, {}),
+        ("vty", pack.vty_re, pack.vty_matcher, vty_lines, {}, {}),
+    )
+    for idx, text in enumerate(lines):
+        for kind, header_re, matcher, blocks, line_flags, bodies in kinds:
+            if header_re.search(text):
+                break
+        else:
+            continue
+        body = tuple(children(idx))
+        flags = None if memo is None else memo.get((text, body))
+        if flags is None:
+            flags = bodies.get(body)
+            if flags is None:
+                key = None if store is None else store.digest(kind, body)
+                flags = None if key is None else store.get(key)
+                if flags is None:
+                    flags = matcher.match_lines(body, line_flags)
+                    if key is not None:
+                        store.put(key, flags)
+                bodies[body] = flags
+        if memo is not None:
+            memo[(text, body)] = flags
+        blocks.append(BlockFacts(text, flags, idx))
+    if global_flags is None:
+        global_flags = pack.global_matcher.search(lines)
+    return ConfigFacts(global_flags, interfaces, vty_lines)
+
+
+def extract_facts(
+    parse: "CiscoConfParse", pack: Optional["RulePack"] = None
+) -> ConfigFacts:
+    """Collect interface, line vty and global facts in one walk of the parse."""
+    if pack is None:
+        from .rulepack import DEFAULT_RULE_PACK as pack
+    objs = parse.config_objs
+    return facts_from_blocks(
+        [obj.text for obj in objs],
+        lambda idx: (child.text for child in objs[idx].children),
+        pack,
+    )
+
+
+def extract_line_facts(
+    index: LineIndex, pack: Optional["RulePack"] = None
+) -> ConfigFacts:
+    """Same as extract_facts() for a config indexed without CiscoConfParse."""
+    if pack is None:
+        from .rulepack import DEFAULT_RULE_PACK as pack
+    return facts_from_blocks(index.lines, index.child_texts, pack)
+
+
+class InterfaceRule(NamedTuple):
+    rule_id: str
+    # Interfaces the rule applies to (ACCESS or L3)
+    scope: int
+    # An interface fails when `flags & mask == value`
+    mask: int
+    value: int
+    fail_msg: str
+    pass_msg: str
+    empty_msg: str
+    # Global fact that satisfies the rule for every interface
+    global_flag: int = 0
+    global_msg: str = ""
+
+    def failed(self, facts: BlockFacts) -> bool:
+        return facts.flags & self.mask == self.value
+
+
+INTERFACE_RULES: Tuple[InterfaceRule, ...] = (
+    InterfaceRule(
+        "I001",
+        ACCESS,
+        NO_MOP | ANY_SHUTDOWN,
+        0,
+        "{0} no mop enabled",
+        "no mop enabled (All access interfaces)",
+        "no mop enabled",
+    ),
+    InterfaceRule(
+        "I002",
+        ACCESS,
+        PORT_SECURITY | PORT_SECURITY_MAC | ANY_SHUTDOWN,
+        0,
+        "{0} switchport port-security mac-address",
+        "switchport port-security (All access interfaces)",
+        "switchport port-security",
+    ),
+    InterfaceRule(
+        "I003",
+        ACCESS,
+        PORTFAST | ANY_SHUTDOWN,
+        0,
+        "{0} spanning-tree portfast",
+        "spanning-tree portfast (All access interfaces)",
+        "spanning-tree portfast",
+        PORTFAST_DEFAULT,
+        "spanning-tree portfast default ([cyan]Global[/cyan])",
+    ),
+    InterfaceRule(
+        "I004",
+        ACCESS,
+        BPDUGUARD | ANY_SHUTDOWN,
+        0,
+        "{0} spanning-tree bpduguard enable",
+        "spanning-tree bpduguard enable (All access interfaces)",
+        "spanning-tree bpduguard",
+        BPDUGUARD_DEFAULT,
+        "spanning-tree portfast bpduguard default ([cyan]Global[/cyan])",
+    ),
+    InterfaceRule(
+        "I005",
+        ACCESS,
+        ROOT_GUARD | ANY_SHUTDOWN,
+        0,
+        "{0} spanning-tree guard root",
+        "spanning-tree guard root (All access interfaces)",
+        "spanning-tree guard root",
+    ),
+    InterfaceRule(
+        "I006",
+        ACCESS,
+        NO_CDP | SHUTDOWN,
+        0,
+        "{0} no cdp enable",
+        "no cdp enable (All access interfaces)",
+        "no cdp enable",
+        NO_CDP_RUN,
+        "no cdp run ([cyan]Global[/cyan])",
+    ),
+    InterfaceRule(
+        "I007",
+        ACCESS,
+        NO_LLDP_TRANSMIT | NO_LLDP_RECEIVE | SHUTDOWN,
+        0,
+        "'{0}' no lldp transmit/receive",
+        "no lldp transmit/receive (All access interfaces)",
+        "no lldp transmit/receive",
+        NO_LLDP_RUN,
+        "no lldp run ([cyan]Global[/cyan])",
+    ),
+    InterfaceRule(
+        "I008",
+        ACCESS,
+        IP_VERIFY_SOURCE | SHUTDOWN,
+        0,
+        "'{0}' ip verify source",
+        "ip verify source (All access interfaces)",
+        "ip verify source",
+    ),
+    InterfaceRule(
+        "I009",
+        ACCESS,
+        PORT_SECURITY_ONLY | STICKY_MAC | SHUTDOWN,
+        STICKY_MAC,
+        "'{0}' switchport port-security mac-address sticky",
+        "switchport port-security (All access interfaces)",
+        "switchport port-security mac-address sticky",
+    ),
+    InterfaceRule(
+        "I010",
+        L3,
+        NO_PROXY_ARP | SHUTDOWN,
+        0,
+        "'{0}' no ip proxy-arp",
+        "no ip proxy-arp (All interfaces)",
+        "no ip proxy-arp",
+        ARP_PROXY_DISABLE,
+        "ip arp proxy disable ([cyan]Global[/cyan])",
+    ),
+    InterfaceRule(
+        "I011",
+        L3,
+        NO_REDIRECTS | SHUTDOWN,
+        0,
+        "'{0}' no ip redirects",
+        "no ip redirects (All interfaces)",
+        "no ip redirects",
+    ),
+    InterfaceRule(
+        "I012",
+        L3,
+        NO_ROUTE_CACHE | SHUTDOWN,
+        0,
+        "'{0}' no ip route-cache",
+        "no ip route-cache (All interfaces)",
+        "no ip route-cache",
+    ),
+    InterfaceRule(
+        "I013",
+        L3,
+        NO_DIRECTED_BROADCAST | SHUTDOWN,
+        0,
+        "'{0}' no ip directed-broadcast",
+        "ip directed-broadcast (All interfaces)",
+        "ip directed-broadcast",
+    ),
+    InterfaceRule(
+        "I014",
+        L3,
+        IP_UNREACHABLES | SHUTDOWN,
+        IP_UNREACHABLES,
+        "'{0}' no ip unreachables",
+        "no ip unreachables ([cyan]All L3 interfaces[/cyan])",
+        "no ip unreachables",
+    ),
+)
+INTERFACE_RULES_BY_ID = {rule.rule_id: rule for rule in INTERFACE_RULES}
+
+# Topic tag -> ids of the interface-level rules about it. Every rule is also
+# tagged with "interface"
+INTERFACE_RULE_TAGS: Dict[str, Tuple[str, ...]] = {
+    "access": (
+        "I001",
+        "I002",
+        "I003",
+        "I004",
+        "I005",
+        "I006",
+        "I007",
+        "I008",
+        "I009",
+    ),
+    "stp": ("I003", "I004", "I005"),
+    "discovery": ("I006", "I007"),
+    "port-security": ("I002", "I008", "I009"),
+    "l3": ("I010", "I011", "I012", "I013", "I014"),
+    "vlan1": (VLAN1_RULE,),
+    "vty": (VTY_SSH_RULE, VTY_EXEC_TIMEOUT_RULE, VTY_LOGGING_SYNC_RULE),
+    "ssh": (VTY_SSH_RULE,),
+}
+# Checks that are not part of INTERFACE_RULES -> interface / vty facts they need
+INTERFACE_CHECK_FACTS = {VLAN1_RULE: ENDS_SHUTDOWN | NO_IP_ADDRESS}
+VTY_CHECK_FACTS = {
+    VTY_SSH_RULE: TRANSPORT_SSH,
+    VTY_EXEC_TIMEOUT_RULE: EXEC_TIMEOUT,
+    VTY_LOGGING_SYNC_RULE: LOGGING_SYNC,
+}
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+import csv
+import heapq
+import json
+from typing import IO, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .bits import bit_count, iter_bits
+from .facts import CHECK_TITLES
+from .results import DeviceResult, Status, strip_markup
+from .rulepack import DEFAULT_RULE_PACK, RulePack
+
+# Statuses that count as a device failing a rule
+FAILING = (Status.FAIL,)
+
+
+class ComplianceMatrix(object):
+    """Rule x device compliance of a fleet, built from per-device results.
+
+    Each rule is a row holding two bitsets over the device columns: the
+    devices it was checked on and the devices that failed it. Per-rule
+    counts are kept as results are added, so pass rates and the top failing
+    rules never rescan the fleet, and no Rich table is ever built.
+    """
+
+    def __init__(
+        self, rules: RulePack = DEFAULT_RULE_PACK, failing: Collection[Status] = FAILING
+    ):
+        self.failing = frozenset(failing)
+        # Column labels (DeviceResult.source) and hostnames, by column
+        self.devices: List[str] = []
+        self.hostnames: List[str] = []
+        self._columns: Dict[str, int] = {}
+        # Rule id -> row, and what each row is about
+        self.rows: Dict[str, int] = {}
+        self.titles: Dict[str, str] = {
+            rule.rule_id: strip_markup(rule.cmd) for rule in rules.engine.rules
+        }
+        self.titles.update(
+            (rule.rule_id, strip_markup(rule.pass_msg))
+            for rule in rules.interface_rules
+        )
+        self.titles.update(
+            (rule_id, CHECK_TITLES[rule_id])
+            for rule_id in rules.checks
+            if rule_id in CHECK_TITLES
+        )
+        self.checked: List[int] = []
+        self.failed: List[int] = []
+        self.checked_count: List[int] = []
+        self.failed_count: List[int] = []
+        # Devices whose audit raised an error
+        self.errors = 0
+
+    @classmethod
+    def from_results(cls, results: Iterable[DeviceResult], **kwargs):
+        matrix = cls(**kwargs)
+        for result in results:
+            matrix.add(result)
+        return matrix
+
+    def __len__(self):
+        return len(self.devices)
+
+    def row(self, rule_id: str, title: str = "") -> int:
+        row = self.rows.get(rule_id)
+        if row is None:
+            row = self.rows[rule_id] = len(self.rows)
+            self.titles.setdefault(rule_id, title or rule_id)
+            self.checked.append(0)
+            self.failed.append(0)
+            self.checked_count.append(0)
+            self.failed_count.append(0)
+        return row
+
+    def add(self, result: DeviceResult) -> int:
+        """Add the findings of one device as a new column and return it."""
+        column = self._columns[result.source] = len(self.devices)
+        self.devices.append(result.source)
+        self.hostnames.append(result.hostname)
+        bit = 1 << column
+        if result.error:
+            self.errors |= bit
+            return column
+        # A device fails a rule if any finding of the rule failed
+        verdicts: Dict[str, bool] = {}
+        for finding in result.findings:
+            failed = finding.status in self.failing
+            if finding.rule_id not in verdicts:
+                self.row(finding.rule_id, finding.text)
+                verdicts[finding.rule_id] = failed
+            elif failed:
+                verdicts[finding.rule_id] = True
+        for rule_id, failed in verdicts.items():
+            row = self.rows[rule_id]
+            self.checked[row] |= bit
+            self.checked_count[row] += 1
+            if failed:
+                self.failed[row] |= bit
+                self.failed_count[row] += 1
+        return column
+
+    def pass_rate(self, rule_id: str) -> Optional[float]:
+        """Fraction of the devices checked that passed `rule_id`."""
+        row = self.rows[rule_id]
+        if not self.checked_count[row]:
+            return None
+        return 1 - self.failed_count[row] / self.checked_count[row]
+
+    def pass_rates(self) -> Dict[str, Optional[float]]:
+        return {rule_id: self.pass_rate(rule_id) for rule_id in self.rows}
+
+    def failing_devices(self, rule_id: str) -> List[str]:
+        """Devices that failed `rule_id`, in the order they were added."""
+        return [self.devices[col] for col in iter_bits(self.failed[self.rows[rule_id]])]
+
+    def failed_rules(self, device: str) -> List[str]:
+        """Rules that `device` failed (the last device added with that label)."""
+        bit = 1 << self._columns[device]
+        return [rule_id for rule_id, row in self.rows.items() if self.failed[row] & bit]
+
+    def top_failing(self, count: int = 10) -> List[Tuple[str, int]]:
+        """(rule id, failing devices) of the `count` most failed rules."""
+        return heapq.nlargest(
+            count,
+            ((rule_id, self.failed_count[row]) for rule_id, row in self.rows.items()),
+            key=lambda item: item[1],
+        )
+
+    def find_rules(self, text: str) -> List[str]:
+        """Ids of the rules whose title contains `text`, e.g. "ip ssh version 2"."""
+        return [rule_id for rule_id in self.rows if text in self.titles[rule_id]]
+
+    def summary(self) -> Iterator[dict]:
+        for rule_id, row in self.rows.items():
+            yield {
+                "rule_id": rule_id,
+                "title": self.titles[rule_id],
+                "checked": self.checked_count[row],
+                "failed": self.failed_count[row],
+                "pass_rate": self.pass_rate(rule_id),
+            }
+
+    def write_summary(self, fp: IO[str]) -> None:
+        """Write the per-rule counts and pass rates as CSV."""
+        writer = csv.DictWriter(
+            fp, ("rule_id", "title", "checked", "failed", "pass_rate")
+        )
+        writer.writeheader()
+        writer.writerows(self.summary())
+
+    def write_matrix(self, fp: IO[str]) -> None:
+        """Write the full matrix as CSV, a row per device and a column per rule.
+
+        Cells are PASS, FAIL or empty when the rule was not checked.
+        """
+        rows = list(self.rows.values())
+        writer = csv.writer(fp)
+        writer.writerow(("source", "hostname", *self.rows))
+        for col, (device, hostname) in enumerate(zip(self.devices, self.hostnames)):
+            writer.writerow((device, hostname, *(self.cell(row, col) for row in rows)))
+
+    def cell(self, row: int, col: int) -> str:
+        if not self.checked[row] >> col & 1:
+            return ""
+        return "FAIL" if self.failed[row] >> col & 1 else "PASS"
+
+    def as_dict(self) -> dict:
+        # Bitsets as hex strings, one digit per 4 devices
+        return {
+            "devices": self.devices,
+            "hostnames": self.hostnames,
+            "errors": format(self.errors, "x"),
+            "rules": {
+                rule_id: {
+                    "title": self.titles[rule_id],
+                    "checked": format(self.checked[row], "x"),
+                    "failed": format(self.failed[row], "x"),
+                }
+                for rule_id, row in self.rows.items()
+            },
+        }
+
+    def dump(self, fp: IO[str]) -> None:
+        json.dump(self.as_dict(), fp)
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs):
+        matrix = cls(**kwargs)
+        matrix.devices = list(data["devices"])
+        matrix.hostnames = list(data["hostnames"])
+        matrix._columns = {device: col for col, device in enumerate(matrix.devices)}
+        matrix.errors = int(data["errors"], 16)
+        for rule_id, rule in data["rules"].items():
+            row = matrix.row(rule_id, rule["title"])
+            matrix.titles[rule_id] = rule["title"]
+            matrix.checked[row] = int(rule["checked"], 16)
+            matrix.failed[row] = int(rule["failed"], 16)
+            matrix.checked_count[row] = bit_count(matrix.checked[row])
+            matrix.failed_count[row] = bit_count(matrix.failed[row])
+        return matrix
+
+    @classmethod
+    def load(cls, fp: IO[str], **kwargs):
+        return cls.from_dict(json.load(fp), **kwargs)
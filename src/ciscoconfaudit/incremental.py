@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from collections import ChainMap, Counter
+from typing import Dict, List, Optional, Tuple
+
+from .facts import HOSTNAME, facts_from_blocks
+from .lineindex import LineIndex
+from .results import DeviceResult
+from .rulepack import DEFAULT_RULE_PACK, RulePack
+from .rules import TokenIndex
+
+
+class DeviceState(object):
+    """What is kept of a device's last audit to re-audit it incrementally."""
+
+    __slots__ = ("digest", "lines", "rule_counts", "fact_counts", "blocks", "result")
+
+    def __init__(
+        self,
+        digest: str,
+        lines: "Counter[str]",
+        rule_counts: List[int],
+        fact_counts: List[int],
+        blocks: Dict[Tuple[str, Tuple[str, ...]], int],
+        result: DeviceResult,
+    ):
+        self.digest = digest
+        # Multiset of the config lines
+        self.lines = lines
+        # Number of lines matching each global rule / global fact pattern
+        self.rule_counts = rule_counts
+        self.fact_counts = fact_counts
+        # (header, children) of each interface / line vty block -> flags
+        self.blocks = blocks
+        self.result = result
+
+
+def update_counts(
+    index: TokenIndex, counts: List[int], lines: "Counter[str]", sign: int
+):
+    for line, count in lines.items():
+        for idx in index.matches(line):
+            counts[idx] += sign * count
+
+
+class IncrementalAuditor(object):
+    """Re-audit devices by only evaluating what changed since their last run.
+
+    For each device key the auditor keeps the lines of the last config, how
+    many of them match each global rule, and the facts of every interface and
+    line vty block. A new config is compared line by line with the previous
+    one: only added and removed lines are run against the global rules, only
+    new or modified blocks are matched again, and a config with the same
+    SHA-256 as last time returns the previous result untouched. Configs are
+    indexed with LineIndex, so CiscoConfParse is never built.
+    """
+
+    def __init__(self, rules: RulePack = DEFAULT_RULE_PACK):
+        self.rules = rules
+        self.states: Dict[str, DeviceState] = {}
+        # How many audits were skipped, incremental, or done from scratch
+        self.skipped = 0
+        self.incremental = 0
+        self.full = 0
+
+    def audit(self, key: str, running_config: str) -> DeviceResult:
+        from . import CiscoConfAudit, config_digest
+
+        digest = config_digest(running_config)
+        state = self.states.get(key)
+        if state is not None and state.digest == digest:
+            self.skipped += 1
+            return state.result
+
+        engine, global_matcher = self.rules.engine, self.rules.global_matcher
+        lines = running_config.splitlines()
+        counts = Counter(lines)
+        if state is None:
+            rule_counts = [0] * len(engine.rules)
+            fact_counts = [0] * len(global_matcher.flags)
+            added, removed, blocks = counts, Counter(), {}
+            self.full += 1
+        else:
+            rule_counts = list(state.rule_counts)
+            fact_counts = list(state.fact_counts)
+            added, removed = counts - state.lines, state.lines - counts
+            blocks = state.blocks
+            self.incremental += 1
+        for index, pattern_counts in (
+            (engine.index, rule_counts),
+            (global_matcher.index, fact_counts),
+        ):
+            update_counts(index, pattern_counts, removed, -1)
+            update_counts(index, pattern_counts, added, 1)
+
+        global_flags = 0
+        for flag, count in zip(global_matcher.flags, fact_counts):
+            if count:
+                global_flags |= flag
+        index = LineIndex(lines)
+        memo = ChainMap({}, blocks)
+        facts = facts_from_blocks(
+            lines, index.child_texts, self.rules, global_flags, memo
+        )
+
+        audit = CiscoConfAudit(rules=self.rules)
+        audit.hostname = index.re_match_iter_typed(HOSTNAME, default="Device")
+        audit.apply_global([count > 0 for count in rule_counts])
+        audit.apply_interfaces(facts)
+        result = DeviceResult(
+            key,
+            audit.hostname,
+            audit.global_findings,
+            audit.interface_findings,
+            0.0,
+        )
+        self.states[key] = DeviceState(
+            digest, counts, rule_counts, fact_counts, memo.maps[0], result
+        )
+        return result
+
+    def forget(self, key: Optional[str] = None):
+        """Drop the state of device `key`, or of every device."""
+        if key is None:
+            self.states.clear()
+        else:
+            self.states.pop(key, None)
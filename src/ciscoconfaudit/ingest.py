@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import gzip
+import mmap
+import os
+import re
+import tarfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Union
+
+# Last line of an IOS running config
+_end_re = re.compile(rb"^end\r?$", re.MULTILINE)
+SPLIT_MODES = ("end", "file")
+
+
+class DeviceConfig(NamedTuple):
+    """A running config cut out of a larger file or archive."""
+
+    source: str
+    text: str
+
+
+def _label(name: str, count: int) -> str:
+    return name if count == 1 else f"{name}#{count}"
+
+
+def split_lines(
+    lines: Iterable[str], name: str, split: str = "end"
+) -> Iterator[DeviceConfig]:
+    """Group streamed `lines` (with line endings) into device configs.
+
+    With split="end" a config ends at its `end` line; "file" keeps all the
+    lines as one config. Only the config being collected is held in memory.
+    """
+    chunk: List[str] = []
+    count = 0
+    for line in lines:
+        chunk.append(line)
+        if split == "end" and line.rstrip("\r\n") == "end":
+            count += 1
+            yield DeviceConfig(_label(name, count), "".join(chunk))
+            chunk = []
+    if any(line.strip() for line in chunk):
+        yield DeviceConfig(_label(name, count + 1), "".join(chunk))
+
+
+def split_mapped(
+    path: Union[str, "os.PathLike[str]"], split: str = "end", encoding: str = "utf-8"
+) -> Iterator[DeviceConfig]:
+    """Memory-map a (concatenated) config file and yield each config in it.
+
+    The file is never read as a whole; each config is decoded from the map
+    on its own, so memory holds one device at a time.
+    """
+    name = os.fspath(path)
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start, count = 0, 0
+            # search() rather than finditer(), which would keep the map
+            # exported and make closing it fail if the caller stops early
+            match = _end_re.search(mapped) if split == "end" else None
+            while match is not None:
+                count += 1
+                text = mapped[start : match.end()].decode(encoding, "replace")
+                start = match.end() + 1
+                match = _end_re.search(mapped, match.end())
+                yield DeviceConfig(_label(name, count), text)
+            rest = mapped[start:]
+            if rest.strip():
+                yield DeviceConfig(
+                    _label(name, count + 1), rest.decode(encoding, "replace")
+                )
+
+
+def split_tar(
+    path: Union[str, "os.PathLike[str]"], split: str = "end", encoding: str = "utf-8"
+) -> Iterator[DeviceConfig]:
+    """Stream a (compressed) tar archive and yield the configs of its files."""
+    name = os.fspath(path)
+    with tarfile.open(name, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            # Members of a streamed archive are not seekable, which rules out
+            # io.TextIOWrapper; decode line by line instead
+            lines = (
+                line.decode(encoding, "replace") for line in archive.extractfile(member)
+            )
+            yield from split_lines(lines, f"{name}:{member.name}", split)
+
+
+def split_gzip(
+    path: Union[str, "os.PathLike[str]"], split: str = "end", encoding: str = "utf-8"
+) -> Iterator[DeviceConfig]:
+    name = os.fspath(path)
+    with gzip.open(name, "rt", encoding=encoding, errors="replace") as lines:
+        yield from split_lines(lines, name, split)
+
+
+def iter_configs(
+    path: Union[str, "os.PathLike[str]"], split: str = "end", encoding: str = "utf-8"
+) -> Iterator[DeviceConfig]:
+    """Yield the device configs stored in `path`, one at a time.
+
+    `path` may be a config file, several configs concatenated in one file, a
+    gzip-compressed file, a tar archive (plain, .tar.gz, .tar.bz2, .tar.xz)
+    or a directory of any of those. The results can be handed straight to
+    audit_many(), iter_audit() or stream_report().
+    """
+    if split not in SPLIT_MODES:
+        raise ValueError(f"split must be one of {SPLIT_MODES}, not {split!r}")
+    path = Path(path)
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file():
+                yield from iter_configs(child, split, encoding)
+    elif tarfile.is_tarfile(path):
+        yield from split_tar(path, split, encoding)
+    elif path.suffix == ".gz":
+        yield from split_gzip(path, split, encoding)
+    else:
+        yield from split_mapped(path, split, encoding)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+COMMENT_DELIMITER = "!"
+
+# Same banner detection as ciscoconfparse2 for syntax="ios"
+_banner_re = re.compile(
+    "|".join(
+        [
+            rf"^(set\s+)*banner\s+{banner}"
+            for banner in ("login", "motd", "incoming", "exec", "telnet", "lcd")
+        ]
+        + ["aaa authentication fail-message"]
+    )
+)
+_banner_delimiter_re = re.compile(r"^(?:(?:set\s+)*banner\s\w+\s+)(?P<delimiter>\S)")
+
+
+class LineIndex(object):
+    """Parent / child structure of a running config, without CiscoConfParse.
+
+    Children are assigned exactly like ciscoconfparse2 does for syntax="ios"
+    (including its parent cache, indented comments, banners and macros), so
+    audits run against a LineIndex give the same results as against a parse.
+    """
+
+    __slots__ = ("lines", "parents", "children", "closed", "_blocks")
+
+    def __init__(self, lines: Iterable[str]):
+        self.lines: List[str] = list(lines)
+        # Index of the parent of each line, -1 for root lines
+        self.parents: List[int] = [-1] * len(self.lines)
+        self.children: Dict[int, List[int]] = {}
+        # False when a banner or macro runs to the end of the lines
+        self.closed = True
+        # Line -> factory object of the block it heads, see parse_block()
+        self._blocks: Dict[int, object] = {}
+        self._bootstrap()
+        self._mark_banners()
+        self._mark_macros()
+
+    @classmethod
+    def from_text(cls, running_config: str) -> "LineIndex":
+        return cls(running_config.splitlines())
+
+    def _adopt(self, parent: int, child: int):
+        self.children.setdefault(parent, []).append(child)
+        self.parents[child] = parent
+
+    def _bootstrap(self):
+        indents, config_lines = [], []
+        parents_cache: Dict[int, int] = {}
+        max_indent = 0
+        for idx, text in enumerate(self.lines):
+            stripped = text.lstrip()
+            indent = len(text) - len(stripped)
+            is_comment = bool(stripped) and stripped[0] == COMMENT_DELIMITER
+            is_config_line = bool(stripped) and not is_comment
+            parent = -1
+            if is_config_line and indent < max_indent:
+                for cached in [cached for cached in parents_cache if cached >= indent]:
+                    del parents_cache[cached]
+            else:
+                parent = parents_cache.get(indent, -1)
+            if indent > 0:
+                if parent < 0:
+                    for candidate in range(idx - 1, -1, -1):
+                        if indents[candidate] < indent and config_lines[candidate]:
+                            parent = parents_cache[indent] = candidate
+                            break
+                # ciscoconfparse2 never makes a comment the child of a block
+                # when the line above it is indented deeper
+                if parent >= 0 and not (is_comment and indents[idx - 1] > indent):
+                    self._adopt(parent, idx)
+            if indent == 0 and is_config_line:
+                max_indent = 0
+            elif indent > max_indent:
+                max_indent = indent
+            indents.append(indent)
+            config_lines.append(is_config_line)
+
+    def _mark_banners(self):
+        lines = self.lines
+        for idx, text in enumerate(lines):
+            if not _banner_re.search(text):
+                continue
+            match = _banner_delimiter_re.search(text)
+            if match is None:
+                continue
+            delimiter = match.group("delimiter")
+            if len(text.split(delimiter)) > 2:
+                continue
+            for child in range(idx + 1, len(lines)):
+                self._adopt(idx, child)
+                if delimiter in lines[child].strip():
+                    break
+            else:
+                self.closed = False
+
+    def _mark_macros(self):
+        lines = self.lines
+        for idx, text in enumerate(lines):
+            if text[0:11] != "macro name ":
+                continue
+            for child in range(idx + 1, len(lines)):
+                self._adopt(idx, child)
+                if lines[child].rstrip() == "@":
+                    break
+            else:
+                self.closed = False
+
+    def child_texts(self, idx: int) -> List[str]:
+        lines = self.lines
+        return [lines[child] for child in self.children.get(idx, ())]
+
+    def block_end(self, idx: int) -> int:
+        # A block runs from its header up to the next root line
+        parents, end = self.parents, idx + 1
+        while end < len(parents) and parents[end] >= 0:
+            end += 1
+        return end
+
+    def block_lines(self, idx: int) -> List[str]:
+        return self.lines[idx : self.block_end(idx)]
+
+    def parse_block(self, idx: int):
+        """Factory (typed) ciscoconfparse2 object for the block headed by `idx`.
+
+        Only the lines of that block are parsed, on first use, so blocks no
+        check asks for (route-maps, ACLs, crypto...) are never materialized.
+        """
+        obj = self._blocks.get(idx)
+        if obj is None:
+            from ciscoconfparse2 import CiscoConfParse
+
+            parse = CiscoConfParse(self.block_lines(idx), syntax="ios", factory=True)
+            obj = self._blocks[idx] = parse.config_objs[0]
+        return obj
+
+    def roots(self) -> Iterator[str]:
+        for text, parent in zip(self.lines, self.parents):
+            if parent < 0:
+                yield text
+
+    def re_match_iter_typed(
+        self, regexspec: str, group: int = 1, default: Optional[str] = ""
+    ) -> Optional[str]:
+        # Same as CiscoConfParse.re_match_iter_typed() for str results
+        regex = re.compile(regexspec)
+        for text in self.roots():
+            match = regex.search(text)
+            if match is not None:
+                return match.group(group)
+        return default
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import IO, Collection, Dict, Iterable, List, Optional, Tuple
+
+from .results import DEVICE, DeviceResult, Finding, Status
+
+FAIL = "[bold red]:heavy_multiplication_x: FAIL[/bold red]"
+PASS = "[bold green]:heavy_check_mark: PASS[/bold green]"
+RECOMMENDED = "[bold blue]RECOMMENDED[/bold blue]"
+WARN = "[bold yellow]WARN[/bold yellow]"
+NOT_IN_USE = "[bold white]NOT IN USE[/bold white]"
+NOT_FOUND = "[bold white]NOT FOUND[/bold white]"
+UNAVAILABLE = "[bold white]UNAVAILABLE[/bold white]"
+
+STATUS_MARKUP = {
+    Status.PASS: PASS,
+    Status.FAIL: FAIL,
+    Status.WARN: WARN,
+    Status.RECOMMENDED: RECOMMENDED,
+    Status.NOT_IN_USE: NOT_IN_USE,
+    Status.NOT_FOUND: NOT_FOUND,
+    Status.UNAVAILABLE: UNAVAILABLE,
+}
+
+CSV_FIELDS = ("device", "rule_id", "target", "status", "message")
+# Fields of the streaming reports, which also name the config each row came from
+STREAM_FIELDS = ("source",) + CSV_FIELDS
+# Status of the record written for a config that could not be audited
+ERROR = "ERROR"
+
+
+def create_table(title: str):
+    from rich.table import Table
+
+    table = Table(
+        show_header=True,
+        show_edge=True,
+        show_lines=False,
+        expand=True,
+        highlight=True,
+        caption=f"End of {title}",
+        title=f"[bold magenta]{title}[/bold magenta]",
+    )
+    table.add_column(header="Audit", no_wrap=True)
+    table.add_column(header="Status", no_wrap=True)
+    return table
+
+
+# Targets named in a summary row of a rule's per-target findings
+SUMMARY_TOP = 5
+
+# Target placeholder of a message template, with the quotes / arrow around it
+_TARGET_FIELD = re.compile(r"'?\{0(?::s)?\}'?(?:\s*-->)?\s*")
+
+
+def summary_label(finding: Finding) -> str:
+    # Message of a per-target finding without its target: "no mop enabled"
+    template = finding.template or finding.message.replace(finding.target, "{0}")
+    return _TARGET_FIELD.sub("", template).strip()
+
+
+def summarize(findings: Iterable[Finding], top: int = SUMMARY_TOP) -> List[Finding]:
+    """`findings` with the per-target ones collapsed per rule.
+
+    Findings of a rule with the same status on several interfaces or lines
+    become one device finding with their count and the first `top` targets;
+    the others are kept as they are. Only those targets are formatted, so the
+    summary costs about the same for 48 ports as for 5000.
+    """
+    # Device findings, and (rule id, status) keys of collapsed findings, in
+    # the order they were found
+    top = max(top, 1)
+    order: List[object] = []
+    groups: Dict[Tuple[str, Status], list] = {}
+    for finding in findings:
+        if finding.target == DEVICE:
+            order.append(finding)
+            continue
+        key = (finding.rule_id, finding.status)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = [0, []]
+            order.append(key)
+        group[0] += 1
+        if len(group[1]) < top:
+            group[1].append(finding)
+    summary: List[Finding] = []
+    for item in order:
+        if isinstance(item, Finding):
+            summary.append(item)
+            continue
+        count, first = groups[item]
+        if count == 1:
+            summary.extend(first)
+            continue
+        noun = first[0].target.split(None, 1)[0]
+        names = ", ".join(f.target.split(None, 1)[-1] for f in first)
+        if count > len(first):
+            names += f" and {count - len(first)} more"
+        message = f"{summary_label(first[0])} ([cyan]{count} {noun}s[/cyan]: {names})"
+        summary.append(Finding(item[0], DEVICE, item[1], message))
+    return summary
+
+
+def render_table(
+    title: str,
+    findings: Iterable[Finding],
+    statuses: Optional[Collection[Status]] = None,
+    summary: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    top: int = SUMMARY_TOP,
+):
+    """Build the Rich table of `findings`, one row per finding.
+
+    Only findings with one of `statuses` are shown when given. `summary`
+    collapses per-target findings with summarize(), and `offset` / `limit`
+    show one page of the rows, so the table stays small however many ports
+    the device has.
+    """
+    table = create_table(title)
+    if statuses is not None:
+        findings = [f for f in findings if f.status in statuses]
+    if summary:
+        findings = summarize(findings, top)
+        # Wrap the long rows listing their targets rather than the status
+        table.columns[0].no_wrap = False
+    if offset or limit is not None:
+        findings = findings if isinstance(findings, list) else list(findings)
+        total = len(findings)
+        stop = total if limit is None else min(offset + limit, total)
+        shown = f"Rows {offset + 1}-{stop}" if stop > offset else "No rows shown"
+        table.caption = f"{shown} of {total}, end of {title}"
+        findings = findings[offset:stop]
+    for finding in findings:
+        table.add_row(finding.message, STATUS_MARKUP[finding.status])
+    return table
+
+
+def finding_record(finding: Finding, device: Optional[str] = None) -> dict:
+    record = finding.as_dict()
+    if device is not None:
+        record = {"device": device, **record}
+    return record
+
+
+def write_json(
+    fp: IO[str], findings: Iterable[Finding], device: Optional[str] = None
+) -> None:
+    json.dump([finding_record(finding, device) for finding in findings], fp)
+
+
+def write_csv(
+    fp: IO[str],
+    findings: Iterable[Finding],
+    device: Optional[str] = None,
+    header: bool = True,
+) -> None:
+    writer = csv.writer(fp)
+    if header:
+        writer.writerow(CSV_FIELDS)
+    for finding in findings:
+        writer.writerow(
+            (
+                device or "",
+                finding.rule_id,
+                finding.target,
+                finding.status.value,
+                finding.text,
+            )
+        )
+
+
+class ReportWriter(ABC):
+    """Write the findings of one device at a time to `fp`.
+
+    Each device is flushed as soon as it is written and nothing is kept
+    afterwards, so memory stays flat however many devices are reported.
+    """
+
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.devices = 0
+        self.records = 0
+
+    def write_result(self, result: DeviceResult) -> None:
+        if result.error:
+            self.write_record(
+                {
+                    "source": result.source,
+                    "device": result.hostname,
+                    "rule_id": "",
+                    "target": DEVICE,
+                    "status": ERROR,
+                    "message": result.error,
+                }
+            )
+        else:
+            for finding in result.findings:
+                self.write_record(
+                    {"source": result.source, "device": result.hostname}
+                    | finding.as_dict()
+                )
+        self.fp.flush()
+        self.devices += 1
+
+    @abstractmethod
+    def write_record(self, record: dict) -> None:
+        """Write one finding (or error) record with the STREAM_FIELDS keys."""
+
+
+class JsonLinesWriter(ReportWriter):
+    def write_record(self, record: dict) -> None:
+        self.fp.write(json.dumps(record) + "\n")
+        self.records += 1
+
+
+class CsvWriter(ReportWriter):
+    def __init__(self, fp: IO[str], header: bool = True):
+        super().__init__(fp)
+        self.writer = csv.DictWriter(fp, STREAM_FIELDS)
+        if header:
+            self.writer.writeheader()
+
+    def write_record(self, record: dict) -> None:
+        self.writer.writerow(record)
+        self.records += 1
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "csv": CsvWriter}
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import re
+import sys
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Target of findings that are about the whole device rather than one block
+DEVICE = "device"
+
+_markup_re = re.compile(r"\[/?[a-z][a-z ]*\]")
+
+
+def strip_markup(text: str) -> str:
+    """Drop the Rich markup tags (`[cyan]...[/cyan]`) used in check texts."""
+    return _markup_re.sub("", text)
+
+
+class Status(str, Enum):
+    PASS = "PASS"
+    FAIL = "FAIL"
+    WARN = "WARN"
+    RECOMMENDED = "RECOMMENDED"
+    NOT_IN_USE = "NOT IN USE"
+    NOT_FOUND = "NOT FOUND"
+    UNAVAILABLE = "UNAVAILABLE"
+
+    def __str__(self):
+        return self.value
+
+
+class Finding(object):
+    """Result of one check: rule id, target, Status and message.
+
+    Big switches get a finding per failing port and rule, so a finding only
+    refers to shared objects: its rule id and target are interned, and a
+    per-target message is kept as the rule's template and only formatted
+    with the target when `message` is read, i.e. when it is reported.
+    """
+
+    __slots__ = ("rule_id", "target", "status", "_message", "_template")
+
+    def __init__(
+        self,
+        rule_id: str,
+        target: str,
+        status: Status,
+        message: str,
+        template: bool = False,
+    ):
+        self.rule_id = sys.intern(rule_id)
+        # DEVICE or the header of the interface / line block checked
+        self.target = sys.intern(target)
+        self.status = status
+        # The message, or its template when `template` is set
+        self._message = sys.intern(message)
+        self._template = template
+
+    @classmethod
+    def formatted(cls, rule_id: str, target: str, status: Status, template: str):
+        """Finding whose message is `template.format(target)`."""
+        return cls(rule_id, target, status, template, True)
+
+    @property
+    def message(self) -> str:
+        # Check text as shown in the report, may contain Rich markup
+        if self._template:
+            return self._message.format(self.target)
+        return self._message
+
+    @property
+    def template(self) -> Optional[str]:
+        # Message template of a per-target finding, "{0} no mop enabled"
+        return self._message if self._template else None
+
+    @property
+    def text(self) -> str:
+        return strip_markup(self.message)
+
+    def __iter__(self):
+        # Unpacks as (rule_id, target, status, message)
+        return iter((self.rule_id, self.target, self.status, self.message))
+
+    def __eq__(self, other):
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return (
+            f"Finding(rule_id={self.rule_id!r}, target={self.target!r},"
+            f" status={self.status!r}, message={self.message!r})"
+        )
+
+    def __reduce__(self):
+        # Keeps the template through pickling (results of pool workers)
+        return (
+            Finding,
+            (self.rule_id, self.target, self.status, self._message, self._template),
+        )
+
+    def as_row(self) -> list:
+        """JSON-ready [rule id, target, status, message or template, template]."""
+        rule_id, target, status, message, template = self.__reduce__()[1]
+        return [rule_id, target, status.value, message, template]
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "Finding":
+        # Rows written before templates were kept have four fields
+        rule_id, target, status, message, *template = row
+        return cls(
+            rule_id, target, Status(status), message, bool(template and template[0])
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "rule_id": self.rule_id,
+            "target": self.target,
+            "status": self.status.value,
+            "message": self.text,
+        }
+
+
+class DeviceResult(NamedTuple):
+    source: str
+    hostname: str
+    global_findings: List[Finding]
+    interface_findings: List[Finding]
+    parse_time: float
+    error: Optional[str] = None
+    # AuditStats.as_dict() of the audit when it ran with stats enabled
+    stats: Optional[Dict[str, Dict[str, float]]] = None
+
+    @property
+    def findings(self) -> List[Finding]:
+        return self.global_findings + self.interface_findings
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Dict, FrozenSet, Iterable, Sequence, Set, Tuple
+
+from .blockstore import BlockStore
+from .facts import (
+    GLOBAL_FACTS,
+    HOSTNAME,
+    INTERFACE_CHECK_FACTS,
+    INTERFACE_FACTS,
+    INTERFACE_RULE_TAGS,
+    INTERFACE_RULES,
+    IS_INTERFACE,
+    IS_VTY_LINE,
+    VTY_CHECK_FACTS,
+    VTY_FACTS,
+    FlagMatcher,
+    InterfaceRule,
+)
+from .rules import GLOBAL_RULE_TAGS, GLOBAL_RULES, GlobalRule, GlobalRuleEngine
+
+FactTable = Sequence[Tuple[int, str]]
+
+
+class RulePack(object):
+    """Every pattern an audit uses, compiled once and shared between audits.
+
+    Patterns are routed by their first word and each group of patterns that
+    share a first word is prefiltered by one combined alternation (see
+    TokenIndex). A pack pickles as its rule tables only, and unpickling
+    reuses the pack recently built for the same tables in that process (see
+    rule_pack()), so sending it to pool workers with every task is cheap.
+    """
+
+    def __init__(
+        self,
+        global_rules: Sequence[GlobalRule] = GLOBAL_RULES,
+        interface_rules: Sequence[InterfaceRule] = INTERFACE_RULES,
+        interface_facts: FactTable = INTERFACE_FACTS,
+        vty_facts: FactTable = VTY_FACTS,
+        global_facts: FactTable = GLOBAL_FACTS,
+        checks: Sequence[str] = (*INTERFACE_CHECK_FACTS, *VTY_CHECK_FACTS),
+    ):
+        self.tables = (
+            tuple(global_rules),
+            tuple(interface_rules),
+            tuple(interface_facts),
+            tuple(vty_facts),
+            tuple(global_facts),
+            tuple(checks),
+        )
+        self.digest = hashlib.sha256(repr(self.tables).encode("utf-8")).hexdigest()
+        self.engine = GlobalRuleEngine(global_rules)
+        self.interface_rules: Tuple[InterfaceRule, ...] = tuple(interface_rules)
+        self.interface_rules_by_id: Dict[str, InterfaceRule] = {
+            rule.rule_id: rule for rule in self.interface_rules
+        }
+        self.interface_matcher = FlagMatcher(interface_facts)
+        self.vty_matcher = FlagMatcher(vty_facts)
+        self.global_matcher = FlagMatcher(global_facts)
+        self.hostname_re = re.compile(HOSTNAME)
+        self.interface_re = re.compile(IS_INTERFACE)
+        self.vty_re = re.compile(IS_VTY_LINE)
+        # What the pack found in each config block seen by this process
+        self.blocks = BlockStore()
+        # Ids of the interface-level checks that are not InterfaceRules
+        self.checks: Tuple[str, ...] = tuple(checks)
+        self.rule_ids: FrozenSet[str] = frozenset(
+            (
+                *(rule.rule_id for rule in self.engine.rules),
+                *self.interface_rules_by_id,
+                *self.checks,
+            )
+        )
+
+    def selects(self, *rule_ids: str) -> bool:
+        """Whether any of `rule_ids` is part of the pack."""
+        return any(rule_id in self.rule_ids for rule_id in rule_ids)
+
+    def rule_tags(self) -> Dict[str, Set[str]]:
+        tags: Dict[str, Set[str]] = {}
+        for rule in self.engine.rules:
+            tags[rule.rule_id] = {"global", rule.kind}
+        for rule_id in (*self.interface_rules_by_id, *self.checks):
+            tags[rule_id] = {"interface"}
+        for tag_table in (GLOBAL_RULE_TAGS, INTERFACE_RULE_TAGS):
+            for tag, rule_ids in tag_table.items():
+                for rule_id in rule_ids:
+                    if rule_id in tags:
+                        tags[rule_id].add(tag)
+        return tags
+
+    def select(
+        self, include: Iterable[str] = (), exclude: Iterable[str] = ()
+    ) -> "RulePack":
+        """A pack of the rules in `include` (all by default) but not `exclude`.
+
+        Both are rule ids, glob patterns of rule ids ("G05*") or tags ("ssh",
+        "aaa", "l3", see GLOBAL_RULE_TAGS / INTERFACE_RULE_TAGS). Rules that a
+        selected rule requires are kept. Facts that no selected rule looks at
+        are dropped, so their patterns are never matched.
+        """
+        include, exclude = tuple(include), tuple(exclude)
+        tags = self.rule_tags()
+        known = set(tags).union(*tags.values())
+        for item in include + exclude:
+            if item not in known and not any(fnmatchcase(i, item) for i in tags):
+                raise ValueError(f"No rule or tag matches {item!r}")
+
+        def hit(rule_id: str, items: Tuple[str, ...]) -> bool:
+            return any(
+                item in tags[rule_id] or fnmatchcase(rule_id, item) for item in items
+            )
+
+        chosen = {
+            rule_id
+            for rule_id in tags
+            if (not include or hit(rule_id, include)) and not hit(rule_id, exclude)
+        }
+        requires = {rule.rule_id: rule.requires for rule in self.engine.rules}
+        for rule_id in list(chosen):
+            while requires.get(rule_id) and requires[rule_id] not in chosen:
+                rule_id = requires[rule_id]
+                chosen.add(rule_id)
+
+        global_rules, interface_rules, interface_facts, vty_facts, global_facts = (
+            self.tables[:5]
+        )
+        interface_rules = [r for r in interface_rules if r.rule_id in chosen]
+        checks = [rule_id for rule_id in self.checks if rule_id in chosen]
+        interface_flags = global_flags = vty_flags = 0
+        for rule in interface_rules:
+            interface_flags |= rule.scope | rule.mask
+            global_flags |= rule.global_flag
+        for rule_id in checks:
+            interface_flags |= INTERFACE_CHECK_FACTS.get(rule_id, 0)
+            vty_flags |= VTY_CHECK_FACTS.get(rule_id, 0)
+        return rule_pack(
+            tuple(rule for rule in global_rules if rule.rule_id in chosen),
+            tuple(interface_rules),
+            tuple(fact for fact in interface_facts if fact[0] & interface_flags),
+            tuple(fact for fact in vty_facts if fact[0] & vty_flags),
+            tuple(fact for fact in global_facts if fact[0] & global_flags),
+            tuple(checks),
+        )
+
+    def __reduce__(self):
+        return (rule_pack, self.tables)
+
+    def __repr__(self):
+        return (
+            f"<RulePack {len(self.engine.rules)} global rules,"
+            f" {len(self.interface_rules)} interface rules {self.digest[:12]}>"
+        )
+
+
+# Packs kept besides the default one; each has its own block store, so a
+# resident server must not keep one for every selection its clients send
+MAX_PACKS = 16
+
+# Rule tables -> the packs built for them in this process, least recently
+# used first
+_packs: "OrderedDict[tuple, RulePack]" = OrderedDict()
+_packs_lock = threading.Lock()
+
+
+def rule_pack(*tables) -> RulePack:
+    """The RulePack for `tables`, built only the first time it is asked for."""
+    if tables == DEFAULT_RULE_PACK.tables:
+        return DEFAULT_RULE_PACK
+    with _packs_lock:
+        pack = _packs.get(tables)
+        if pack is None:
+            pack = _packs[tables] = RulePack(*tables)
+            while len(_packs) > MAX_PACKS:
+                _packs.popitem(last=False)
+        else:
+            _packs.move_to_end(tables)
+        return pack
+
+
+DEFAULT_RULE_PACK = RulePack()
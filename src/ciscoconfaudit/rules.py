@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+import re
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+# Rule kinds, i.e. how a match of the rule pattern is judged
+SERVICE = "service"  # FAIL when the pattern matches
+CONFIG = "config"  # PASS when the pattern matches, otherwise FAIL
+OPTIONAL = "optional"  # PASS when the pattern matches, otherwise RECOMMENDED
+VULN = "vuln"  # WARN when the pattern matches, otherwise NOT IN USE
+
+
+class GlobalRule(NamedTuple):
+    rule_id: str
+    kind: str
+    pattern: str
+    cmd: str
+    # Only evaluated when the rule with this id passed
+    requires: Optional[str] = None
+
+
+GLOBAL_RULES: Tuple[GlobalRule, ...] = (
+    GlobalRule(
+        "G001",
+        SERVICE,
+        r"^service\stcp-small-servers$",
+        "no service tcp-small-servers",
+    ),
+    GlobalRule(
+        "G002",
+        SERVICE,
+        r"^service\sudp-small-servers$",
+        "no service udp-small-servers",
+    ),
+    GlobalRule("G003", SERVICE, r"^no\sip\sfinger$", "no ip finger"),
+    GlobalRule("G004", SERVICE, r"^no\sservice\sfinger$", "no service finger"),
+    GlobalRule("G005", SERVICE, r"^no\sip\sbootp\sserver$", "no ip bootp server"),
+    GlobalRule("G006", CONFIG, r"^ip\sdhcp\sbootp\signore$", "ip dhcp bootp ignore"),
+    GlobalRule(
+        "G007",
+        CONFIG,
+        r"^no\sip\sdomain-lookup$|^no\sip\sdomain\slookup$",
+        "no ip domain-lookup | no ip domain lookup",
+    ),
+    GlobalRule(
+        "G008",
+        CONFIG,
+        r"^ip\sdomain\sname\s\w+$|^ip\sdomain-name\s\w+$",
+        "ip domain name <domain> | ip domain-name <domain>",
+    ),
+    GlobalRule("G009", SERVICE, r"^no\sservice\spad$", "no service pad"),
+    GlobalRule("G010", CONFIG, r"^no\sip\shttp\sserver$", "no ip http server"),
+    GlobalRule(
+        "G011", CONFIG, r"^no\sip\shttp\ssecure-server$", "no ip http secure-server"
+    ),
+    GlobalRule("G012", SERVICE, r"^no\sservice\sconfig$", "no service config"),
+    GlobalRule(
+        "G013",
+        CONFIG,
+        r"^no\sservice\spassword-recovery$",
+        "no service password-recovery ([yellow]Use with caution[/yellow])",
+    ),
+    GlobalRule("G014", SERVICE, r"^service\scall-home$", "no service call-home"),
+    GlobalRule(
+        "G015",
+        SERVICE,
+        r"^service\spassword-encryption$",
+        "service password-encryption",
+    ),
+    GlobalRule(
+        "G016",
+        CONFIG,
+        r"^service\stimestamps\slog\sdatetime\smsec\slocaltime\sshow-timezone\syear$",
+        "service timestamps log datetime msec localtime show-timezone year",
+    ),
+    GlobalRule(
+        "G017",
+        CONFIG,
+        r"^service\stimestamps\sdebug\sdatetime\smsec\slocaltime\sshow-timezone\syear$",
+        "service timestamps debug datetime msec localtime show-timezone year",
+    ),
+    GlobalRule(
+        "G018", CONFIG, r"^service\stcp-keepalives-in$", "service tcp-keepalives-in"
+    ),
+    GlobalRule(
+        "G019", CONFIG, r"^service\stcp-keepalives-out$", "service tcp-keepalives-out"
+    ),
+    GlobalRule(
+        "G020",
+        CONFIG,
+        r"^configuration\smode\sexclusive\sauto$",
+        "configuration mode exclusive auto",
+    ),
+    GlobalRule("G021", CONFIG, r"^secure\sboot-image$", "secure boot-image"),
+    GlobalRule("G022", CONFIG, r"^secure\sboot-config\W$", "secure boot-config"),
+    GlobalRule("G023", CONFIG, r"^banner\smotd", "banner motd"),
+    GlobalRule("G024", CONFIG, r"^udld\senable$", "udld enable"),
+    GlobalRule("G025", CONFIG, r"^ip\sdhcp\ssnooping$", "ip dhcp snooping"),
+    GlobalRule(
+        "G026",
+        CONFIG,
+        r"^ip\sdhcp\ssnooping\svlan\s\d+(?:,\d+)*$",
+        "ip dhcp snooping vlan <vlan-range>",
+    ),
+    GlobalRule(
+        "G027",
+        CONFIG,
+        r"^ip\sarp\sinspection\svlan\s\d+(?:,\d+)*$",
+        "ip arp inspection vlan <vlan-range>",
+    ),
+    GlobalRule(
+        "G028",
+        CONFIG,
+        r"^ip\sdhcp\ssnooping\sinformation\soption$",
+        "ip dhcp snooping information option",
+    ),
+    GlobalRule("G029", CONFIG, r"^ip\sssh\sversion\s2$", "ip ssh version 2"),
+    GlobalRule("G030", CONFIG, r"^ip\sssh\stime-out\s60$", "ip ssh time-out 60"),
+    GlobalRule(
+        "G031",
+        CONFIG,
+        r"^ip\sssh\sauthentication-retries\s3$",
+        "ip ssh authentication-retries 3",
+    ),
+    GlobalRule(
+        "G032",
+        CONFIG,
+        r"^ip\sssh\sdh\smin\ssize\s(2048|4096)$",
+        "ip ssh dh min size 2048|4096",
+    ),
+    GlobalRule(
+        "G033",
+        OPTIONAL,
+        r"^ip\sssh\sserver\salgorithm\sencryption\saes\d{3}-ctr\saes\d{3}-ctr\saes\d{3}-ctr$",
+        "ip ssh server algorithm encryption aes128-ctr aes192-ctr aes256-ctr",
+    ),
+    GlobalRule(
+        "G034",
+        OPTIONAL,
+        r"^ip\sssh\sclient\salgorithm\sencryption\saes\d{3}-ctr\saes\d{3}-ctr\saes\d{3}-ctr$",
+        "ip ssh client algorithm encryption aes128-ctr aes192-ctr aes256-ctr",
+    ),
+    GlobalRule("G035", CONFIG, r"^no\sip\ssource-route$", "no ip source-route"),
+    GlobalRule("G036", CONFIG, r"^no\sipv6\ssource-route$", "no ipv6 source-route"),
+    GlobalRule(
+        "G037",
+        CONFIG,
+        r"^no\sip\sgratuitous-arps$|^no\sip\sarp\sgratuitous$",
+        "no ip gratuitous-arps | no ip arp gratuitous",
+    ),
+    GlobalRule("G038", CONFIG, r"^ip\soptions\sdrop$", "ip options drop"),
+    GlobalRule("G039", CONFIG, r"^no\svstack$", "no vstack"),
+    GlobalRule("G040", CONFIG, r"^no\slogging\sconsole$", "no logging console"),
+    GlobalRule("G041", CONFIG, r"^no\slogging\smonitor$", "no logging monitor"),
+    GlobalRule(
+        "G042",
+        CONFIG,
+        r"^memory\sfree\slow-watermark\sprocessor\s\d{1,7}$",
+        "memory free low-watermark processor <threshold>",
+    ),
+    GlobalRule(
+        "G043",
+        CONFIG,
+        r"^memory\sfree\slow-watermark\sio\s\d{1,7}$",
+        "memory free low-watermark io <threshold>",
+    ),
+    GlobalRule(
+        "G044",
+        CONFIG,
+        r"^memory\sreserve\scritical\s\d{1,10}$",
+        "memory reserve critical <value>",
+    ),
+    GlobalRule(
+        "G045",
+        OPTIONAL,
+        r"^exception\scrashinfo\smaximum\sfiles\s\d+$",
+        "exception crashinfo maximum files <number-of-files>",
+    ),
+    GlobalRule(
+        "G046", OPTIONAL, r"^vtp\smode\s(transparent|off)$", "vtp mode transparent|off"
+    ),
+    GlobalRule(
+        "G047",
+        OPTIONAL,
+        r"^no\ssystem\signore\sstartupconfig\sswitch\sall$",
+        "no system ignore startupconfig switch all",
+    ),
+    GlobalRule(
+        "G048",
+        OPTIONAL,
+        r"^diagnostic\sbootup\slevel\sminimal$",
+        "diagnostic bootup level minimal",
+    ),
+    GlobalRule(
+        "G049",
+        OPTIONAL,
+        r"^software\sauto-upgrade\senable$",
+        "software auto-upgrade enable",
+    ),
+    GlobalRule(
+        "G050",
+        OPTIONAL,
+        r"^license\ssmart\stransport\soff$",
+        "license smart transport off",
+    ),
+    GlobalRule("G051", OPTIONAL, r"^login\son-success\slog$", "login on-success log"),
+    GlobalRule("G052", OPTIONAL, r"^login\son-failure\slog$", "login on-failure log"),
+    GlobalRule(
+        "G053",
+        OPTIONAL,
+        r"^clock\stimezone\s\w{3,4}\s-?\d{1,2}\s-?\d{1,2}$",
+        "clock timezone <timezone> <hours_offset> <mintues_offset>",
+    ),
+    GlobalRule("G054", CONFIG, r"^ntp\sserver\s\d", "ntp server"),
+    # IOS and IOS-XE versions only
+    GlobalRule(
+        "G055",
+        CONFIG,
+        r"^no\sntp\sallow\smode\scontrol\s0$",
+        "no ntp allow mode control 0",
+    ),
+    GlobalRule(
+        "G056",
+        CONFIG,
+        r"^username\s\w+\sprivilege\s\d{1,2}\ssecret\s[8-9]\s",
+        "username <username> privilege <priv_level> secret [8-9] <password>",
+    ),
+    GlobalRule(
+        "G057",
+        CONFIG,
+        r"^enable\salgorithm-type\sscrypt\ssecret\s",
+        "enable algorithm-type scrypt secret <password>",
+    ),
+    # AAA settings, only checked when AAA is enabled
+    GlobalRule("G058", SERVICE, r"^no\saaa\snew-model$", "aaa new-model"),
+    # Authentication
+    GlobalRule(
+        "G059",
+        CONFIG,
+        r"^aaa\sauthentication\slogin\sdefault\sgroup\stacacs\+\senable$",
+        "aaa authentication login default group tacacs+ enable",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G060",
+        CONFIG,
+        r"^aaa\sauthentication\sattempts\slogin\s\d+$",
+        "aaa authentication attempts login <max-attempts>",
+        requires="G058",
+    ),
+    # Authorization
+    GlobalRule(
+        "G061",
+        CONFIG,
+        r"^aaa\sauthorization\sexec\sdefault\sgroup\stacacs\snone$",
+        "aaa authorization exec default group tacacs none",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G062",
+        CONFIG,
+        r"^aaa\sauthorization\scommands\s0\sdefault\sgroup\stacacs\snone$",
+        "aaa authorization commands 0 default group tacacs none",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G063",
+        CONFIG,
+        r"^aaa\sauthorization\scommands\s1\sdefault\sgroup\stacacs\snone$",
+        "aaa authorization commands 1 default group tacacs none",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G064",
+        CONFIG,
+        r"aaa\sauthorization\scommands\s15\sdefault\sgroup\stacacs\snone",
+        "aaa authorization commands 15 default group tacacs none",
+        requires="G058",
+    ),
+    # Accounting
+    GlobalRule(
+        "G065",
+        CONFIG,
+        r"^aaa\saccounting\sexec\sdefault\sstart-stop\sgroup\stacacs$",
+        "aaa accounting exec default start-stop group tacacs",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G066",
+        CONFIG,
+        r"^aaa\saccounting\scommands\s0\sdefault\sstart-stop\sgroup\stacacs$",
+        "aaa accounting commands 0 default start-stop group tacacs",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G067",
+        CONFIG,
+        r"^aaa\saccounting\scommands\s0\sdefault\sstart-stop\sgroup\stacacs$",
+        "aaa accounting commands 0 default start-stop group tacacs",
+        requires="G058",
+    ),
+    GlobalRule(
+        "G068",
+        CONFIG,
+        r"^aaa\saccounting\scommands\s15\sdefault\sstart-stop\sgroup\stacacs",
+        "aaa accounting commands 15 default start-stop group tacacs",
+        requires="G058",
+    ),
+    # Weak SNMPv2c community strings
+    GlobalRule(
+        "G069",
+        VULN,
+        r"^snmp-server\scommunity\sprivate\srw$|^snmp-server\scommunity\spublic\sro$",
+        "Weak SNMPv2c community string (Trivial authentication)",
+    ),
+)
+
+# Topic tag -> ids of the global rules about it. Every rule is also tagged
+# with "global" and its kind (service, config, optional, vuln)
+GLOBAL_RULE_TAGS: Dict[str, Tuple[str, ...]] = {
+    "services": (
+        "G001",
+        "G002",
+        "G003",
+        "G004",
+        "G005",
+        "G009",
+        "G012",
+        "G014",
+        "G018",
+        "G019",
+    ),
+    "dhcp": ("G005", "G006", "G025", "G026", "G028"),
+    "dns": ("G007", "G008"),
+    "http": ("G010", "G011"),
+    "passwords": ("G013", "G015", "G056", "G057"),
+    "logging": ("G016", "G017", "G040", "G041", "G051", "G052"),
+    "boot": ("G013", "G020", "G021", "G022", "G047", "G048", "G049"),
+    "banner": ("G023",),
+    "l2": ("G024", "G025", "G026", "G027", "G028", "G039", "G046"),
+    "arp": ("G027", "G037"),
+    "ssh": ("G029", "G030", "G031", "G032", "G033", "G034"),
+    "ip": ("G035", "G036", "G037", "G038"),
+    "memory": ("G042", "G043", "G044", "G045"),
+    "ntp": ("G053", "G054", "G055"),
+    "aaa": (
+        "G058",
+        "G059",
+        "G060",
+        "G061",
+        "G062",
+        "G063",
+        "G064",
+        "G065",
+        "G066",
+        "G067",
+        "G068",
+    ),
+    "snmp": ("G069",),
+}
+
+# `^`, optionally `\s` / `\s+` for indented lines, then the literal words a
+# matching line has to start with; a word only counts when `\s` or `$`
+# follows it, as otherwise the line's word may be longer
+_LEADING = re.compile(r"\^(\\s\+?)?")
+_LEADING_WORD = re.compile(r"([\w-]+)(?:\\s(?![*?{])\+?|\$)")
+# A pattern of literal words and `\s` / `\s+` only, optionally anchored,
+# whose words all have to appear in any line it matches
+_LITERAL = re.compile(r"\^?(?:\\s\+?)?[\w-]+(?:\\s\+?[\w-]+)*\$?")
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+# Words of the line prefix that routes are keyed by
+PREFIX_WORDS = 2
+
+# Prefilter of a list of pattern indexes, and the list
+Route = Tuple[Optional[Pattern], List[int]]
+
+
+def split_alternatives(pattern: str) -> List[str]:
+    # Split a regex on its top-level `|` only
+    parts, depth, start, idx = [], 0, 0, 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            idx += 1
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            parts.append(pattern[start:idx])
+            start = idx + 1
+        idx += 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def literal_prefix(alternative: str) -> Optional[Tuple[bool, Tuple[str, ...]]]:
+    """(indented, first words) of the lines `alternative` can match, or None
+    if it does not pin down the first word of the line."""
+    match = _LEADING.match(alternative)
+    if match is None:
+        return None
+    indented, pos, words = match.group(1) is not None, match.end(), []
+    while len(words) < PREFIX_WORDS:
+        match = _LEADING_WORD.match(alternative, pos)
+        if match is None:
+            break
+        words.append(match.group(1))
+        if match.group(0).endswith("$"):
+            break
+        pos = match.end()
+    return (indented, tuple(words)) if words else None
+
+
+def leading_tokens(pattern: str) -> Optional[List[Tuple[bool, Tuple[str, ...]]]]:
+    """literal_prefix() of each alternative of `pattern`, or None if any
+    alternative does not pin down the first word of the line."""
+    tokens = []
+    for alternative in split_alternatives(pattern):
+        prefix = literal_prefix(alternative)
+        if prefix is None:
+            return None
+        tokens.append(prefix)
+    return tokens
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    # Longest word every line matching `pattern` contains, for patterns of
+    # literal words only
+    if not _LITERAL.fullmatch(pattern):
+        return None
+    return max(re.findall(r"[\w-]+", pattern.replace(r"\s", " ")), key=len)
+
+
+class TokenIndex(object):
+    """Route config lines to the patterns that can match them.
+
+    The literal words each pattern starts with are extracted from it, and
+    lines are routed by their first two words to the patterns that start
+    with those words (or with the first one only). Patterns that can match
+    anywhere in a line are only tried on the lines containing their longest
+    literal word, if they are made of literal words.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self.compiled = [re.compile(pattern) for pattern in self.patterns]
+        # First word -> (route of lines whose second word has no route of its
+        # own, second word -> route), for unindented and indented lines
+        self._top: Dict[str, Tuple[Route, Dict[str, Route]]] = {}
+        self._indented: Dict[str, Tuple[Route, Dict[str, Route]]] = {}
+        # Patterns that have to be tried against every line, and those only
+        # tried against lines containing their (literal, index)
+        self._anywhere: List[int] = []
+        self._gated: List[Tuple[str, int]] = []
+        prefixes: Dict[bool, Dict[str, Dict[Optional[str], List[int]]]] = {
+            False: {},
+            True: {},
+        }
+        for idx, pattern in enumerate(self.patterns):
+            tokens = leading_tokens(pattern)
+            if tokens is None:
+                literal = required_literal(pattern)
+                if literal is None:
+                    self._anywhere.append(idx)
+                else:
+                    self._gated.append((literal, idx))
+                continue
+            for indented, words in dict.fromkeys(tokens):
+                second = words[1] if len(words) > 1 else None
+                found = prefixes[indented].setdefault(words[0], {})
+                found = found.setdefault(second, [])
+                if idx not in found:
+                    found.append(idx)
+        # Each candidate list comes with one alternation of all its patterns,
+        # so a line that none of them can match costs a single regex search
+        for indented, index in ((False, self._top), (True, self._indented)):
+            for first, by_second in prefixes[indented].items():
+                common = by_second.pop(None, [])
+                index[first] = (
+                    self._route(common + self._anywhere),
+                    {
+                        second: self._route(found + common + self._anywhere)
+                        for second, found in by_second.items()
+                    },
+                )
+        self._fallback = self._route(self._anywhere)
+
+    def _route(self, indexes: List[int]) -> Route:
+        patterns = [self.patterns[idx] for idx in indexes]
+        # Group numbers shift in an alternation, so backreferences cannot move
+        if len(patterns) < 2 or any(_BACKREF.search(p) for p in patterns):
+            return None, indexes
+        try:
+            combined = re.compile("|".join(f"(?:{p})" for p in patterns))
+        except re.error:
+            return None, indexes
+        return combined, indexes
+
+    def candidates(self, line: str) -> List[int]:
+        """Indexes of the patterns that may match `line`."""
+        prefilter, found = self._fallback
+        if line:
+            index = self._indented if line[0].isspace() else self._top
+            if index:
+                words = line.split(None, 1)
+                routes = index.get(words[0]) if words else None
+                if routes is not None:
+                    prefilter, found = routes[0]
+                    if routes[1] and len(words) > 1:
+                        second = words[1].split(None, 1)[0]
+                        prefilter, found = routes[1].get(second, routes[0])
+        if prefilter is not None and not prefilter.search(line):
+            found = []
+        if self._gated:
+            for literal, idx in self._gated:
+                if literal in line:
+                    found = [*found, idx]
+        return found
+
+    def matches(self, line: str) -> Iterator[int]:
+        compiled = self.compiled
+        for idx in self.candidates(line):
+            if compiled[idx].search(line):
+                yield idx
+
+    def search(self, lines: Iterable[str]) -> List[bool]:
+        """Whether each pattern matches at least one of `lines`."""
+        compiled = self.compiled
+        matched = [False] * len(self.patterns)
+        for line in lines:
+            for idx in self.candidates(line):
+                if not matched[idx] and compiled[idx].search(line):
+                    matched[idx] = True
+        return matched
+
+
+def rule_passed(rule: GlobalRule, matched: bool) -> bool:
+    return not matched if rule.kind == SERVICE else matched
+
+
+class GlobalRuleEngine(object):
+    """Evaluate a table of global rules in a single pass over the config."""
+
+    def __init__(self, rules: Sequence[GlobalRule] = GLOBAL_RULES):
+        self.rules: Tuple[GlobalRule, ...] = tuple(rules)
+        self.index = TokenIndex([rule.pattern for rule in self.rules])
+
+    def match(self, lines: Iterable[str]) -> List[bool]:
+        return self.index.search(lines)
+
+    def evaluate(self, lines: Iterable[str]) -> List[Tuple[GlobalRule, bool]]:
+        """Return (rule, matched) for every rule that applies, in table order."""
+        return self.verdicts(self.match(lines))
+
+    def verdicts(self, matches: Sequence[bool]) -> List[Tuple[GlobalRule, bool]]:
+        # `matches` holds whether each rule's pattern matched, in table order
+        verdicts, passed = [], {}
+        for rule, matched in zip(self.rules, matches):
+            if rule.requires is not None and not passed.get(rule.requires):
+                continue
+            passed[rule.rule_id] = rule_passed(rule, matched)
+            verdicts.append((rule, matched))
+        return verdicts
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence, Tuple, Union
+
+from .results import DeviceResult, Finding, Status
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .rulepack import RulePack
+
+# A UNIX socket path, or a (host, port) on the loopback interface
+Address = Union[str, Tuple[str, int]]
+
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+# Audited by each worker as it starts, so the first real request finds the
+# rules compiled and every module imported
+WARM_UP_CONFIG = """\
+hostname warm-up
+!
+interface GigabitEthernet0/1
+ switchport mode access
+!
+line vty 0 4
+ transport input ssh
+!
+end
+"""
+
+
+def default_address() -> str:
+    """Per-user UNIX socket in $XDG_RUNTIME_DIR, or in a private directory
+    of the temp directory (created by the server with mode 0700)."""
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"ciscoconfaudit-{uid}.sock")
+    return os.path.join(tempfile.gettempdir(), f"ciscoconfaudit-{uid}", "audit.sock")
+
+
+def check_owner(path: str):
+    # Configs hold secrets: only talk to a socket (or use a socket directory)
+    # of the current user, not one another user put at a shared path
+    if hasattr(os, "getuid") and os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user")
+
+
+def private_directory(path: str):
+    # Directory of the socket, created accessible to its owner only
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    check_owner(path)
+    if os.stat(path).st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def encode_result(result: DeviceResult) -> dict:
+    # Findings as Finding.as_row() lists: [rule id, target, status, message,
+    # template], the message being the rule's template to format with the
+    # target when `template` is true. Messages keep their markup so clients
+    # render them like a local audit
+    return {
+        "source": result.source,
+        "hostname": result.hostname,
+        "global_findings": [f.as_row() for f in result.global_findings],
+        "interface_findings": [f.as_row() for f in result.interface_findings],
+        "parse_time": result.parse_time,
+        "error": result.error,
+        "stats": result.stats,
+    }
+
+
+def decode_result(data: dict) -> DeviceResult:
+    findings = [
+        [Finding.from_row(row) for row in data[key]]
+        for key in ("global_findings", "interface_findings")
+    ]
+    return DeviceResult(
+        data["source"],
+        data["hostname"],
+        *findings,
+        data["parse_time"],
+        data.get("error"),
+        data.get("stats"),
+    )
+
+
+def warm_up():
+    from .batch import audit_config
+
+    audit_config(WARM_UP_CONFIG)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # One JSON request per line, answered by one JSON line, until the client
+    # closes the connection
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.service.handle(json.loads(line))
+            except Exception as exc:
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TCP6Server(_TCPServer):
+    address_family = socket.AF_INET6
+
+
+class AuditServer(object):
+    """Resident audit service on a UNIX socket or a loopback TCP port.
+
+    Python startup, imports and rule compilation are paid once, when the
+    server starts, instead of by every audit of a single config. Requests
+    are audited by a pool of `workers` processes warmed up at start (in the
+    handler threads with workers=0). Only local clients can connect: TCP
+    addresses must be on the loopback interface and the UNIX socket is only
+    accessible to its owner.
+    """
+
+    def __init__(
+        self,
+        address: Optional[Address] = None,
+        workers: Optional[int] = None,
+        rules: Optional["RulePack"] = None,
+    ):
+        if rules is None:
+            from .rulepack import DEFAULT_RULE_PACK as rules
+        self.address = address or default_address()
+        if not isinstance(self.address, str) and self.address[0] not in LOCAL_HOSTS:
+            raise ValueError(f"Not a loopback address: {self.address[0]!r}")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.rules = rules
+        self.requests = 0
+        self._executor: Optional["ProcessPoolExecutor"] = None
+        self._server: Optional[socketserver.BaseServer] = None
+
+    def start(self):
+        """Bind the socket and warm up the worker pool."""
+        if isinstance(self.address, str):
+            if self.address == default_address():
+                private_directory(os.path.dirname(self.address))
+            self._remove_stale_socket()
+            umask = os.umask(0o177)
+            try:
+                self._server = _UnixServer(self.address, _Handler)
+            finally:
+                os.umask(umask)
+        else:
+            host, port = self.address
+            server_class = _TCP6Server if ":" in host else _TCPServer
+            self._server = server_class((host, port), _Handler)
+            # Port 0 picks a free port
+            self.address = self._server.server_address[:2]
+        self._server.service = self
+        if self.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=warm_up
+            )
+            for future in [
+                self._executor.submit(os.getpid) for _ in range(self.workers)
+            ]:
+                future.result()
+        else:
+            warm_up()
+
+    def _remove_stale_socket(self):
+        # A socket file left behind by a server that did not shut down
+        if not os.path.exists(self.address):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+        except ConnectionRefusedError:
+            os.unlink(self.address)
+        else:
+            raise OSError(f"An audit server is already listening on {self.address}")
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        if self._server is None:
+            self.start()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        # Call from another thread than serve_forever()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def handle(self, request: dict) -> dict:
+        """Answer one request: {"op": "audit" (default) | "ping", ...}."""
+        op = request.get("op", "audit")
+        if op == "ping":
+            from . import __version__
+
+            return {
+                "version": __version__,
+                "pid": os.getpid(),
+                "workers": self.workers,
+                "requests": self.requests,
+            }
+        if op != "audit":
+            raise ValueError(f"Unknown op {op!r}")
+        return encode_result(self.audit(request))
+
+    def audit(self, request: dict) -> DeviceResult:
+        """Audit request["config"] with the rules and options of `request`."""
+        from .batch import audit_function
+        from .ingest import DeviceConfig
+
+        rules = self.rules
+        include, exclude = request.get("include") or (), request.get("exclude") or ()
+        if include or exclude:
+            rules = rules.select(include, exclude)
+        audit = audit_function(
+            bool(request.get("stats")), rules, bool(request.get("fail_fast"))
+        )
+        config = DeviceConfig(request.get("source") or "<text>", request["config"])
+        self.requests += 1
+        if self._executor is None:
+            return audit(config)
+        return self._executor.submit(audit, config).result()
+
+
+class AuditClient(object):
+    """Connection to an AuditServer, audits one config per request."""
+
+    def __init__(
+        self, address: Optional[Address] = None, timeout: Optional[float] = None
+    ):
+        self.address = address or default_address()
+        if isinstance(self.address, str):
+            check_owner(self.address)
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(self.address)
+        else:
+            self._sock = socket.create_connection(self.address, timeout)
+        self._file = self._sock.makefile("rwb")
+
+    def request(self, request: dict) -> dict:
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The audit server closed the connection")
+        response = json.loads(line)
+        if set(response) == {"error"}:
+            raise RuntimeError(response["error"])
+        return response
+
+    def ping(self) -> dict:
+        return self.request({"op": "ping"})
+
+    def audit(
+        self,
+        config: str,
+        source: str = "<text>",
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        fail_fast: bool = False,
+        stats: bool = False,
+    ) -> DeviceResult:
+        """Audit the running config text `config` on the server."""
+        return decode_result(
+            self.request(
+                {
+                    "config": config,
+                    "source": source,
+                    "include": list(include),
+                    "exclude": list(exclude),
+                    "fail_fast": fail_fast,
+                    "stats": stats,
+                }
+            )
+        )
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_address(args: argparse.Namespace) -> Address:
+    if args.port is not None:
+        return (args.host, args.port)
+    return args.socket or default_address()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from .cli import split_items
+
+    parser = argparse.ArgumentParser(
+        prog="python -m ciscoconfaudit.server",
+        description="Run a resident audit server, or audit configs with it",
+    )
+    parser.add_argument(
+        "--socket", help=f"UNIX socket path (default: {default_address()})"
+    )
+    parser.add_argument("--port", type=int, help="listen on a loopback TCP port")
+    parser.add_argument("--host", default="127.0.0.1", choices=LOCAL_HOSTS)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the server until interrupted")
+    serve.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="audit processes (default: one per CPU, 0 audits in-process)",
+    )
+    commands.add_parser("ping", help="show the status of a running server")
+    audit = commands.add_parser(
+        "audit", help="audit config files (or - for stdin) with the server"
+    )
+    audit.add_argument("paths", nargs="+", metavar="PATH")
+    audit.add_argument("-f", "--format", choices=("jsonl", "csv"), default="jsonl")
+    audit.add_argument("-i", "--include", action="append", metavar="RULES")
+    audit.add_argument("-x", "--exclude", action="append", metavar="RULES")
+    audit.add_argument("--fail-fast", action="store_true")
+    args = parser.parse_args(argv)
+    address = parse_address(args)
+
+    if args.command == "serve":
+        server = AuditServer(address, args.jobs)
+        # Shut down cleanly (removing the socket) on SIGTERM as on Ctrl-C
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            server.start()
+            print(f"Listening on {server.address}", file=sys.stderr)
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return 0
+
+    if args.command == "audit":
+        for path in args.paths:
+            if path != "-" and not os.path.isfile(path):
+                parser.error(f"No such file: {path!r}")
+    try:
+        client = AuditClient(address)
+    except OSError as exc:
+        parser.exit(2, f"Cannot connect to the audit server at {address}: {exc}\n")
+    with client:
+        if args.command == "ping":
+            print(json.dumps(client.ping()))
+            return 0
+        from .report import WRITERS
+
+        writer = WRITERS[args.format](sys.stdout)
+        failed = False
+        for path in args.paths:
+            if path == "-":
+                source, text = "<stdin>", sys.stdin.read()
+            else:
+                with open(path, encoding="utf-8") as fp:
+                    source, text = path, fp.read()
+            result = client.audit(
+                text,
+                source,
+                split_items(args.include),
+                split_items(args.exclude),
+                args.fail_fast,
+            )
+            writer.write_result(result)
+            failed = failed or bool(
+                result.error or any(f.status is Status.FAIL for f in result.findings)
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import cProfile
+import functools
+import time
+from typing import IO, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .results import DeviceResult
+
+# Stage name -> [calls, seconds]
+Timings = Dict[str, List[float]]
+
+
+class AuditStats(object):
+    """Wall time and call count of each stage and check of an audit.
+
+    Attached to CiscoConfAudit(stats=True); an audit created without stats
+    has none of its methods wrapped, so instrumentation costs nothing then.
+    With `profile`, the top-level stages also run under cProfile.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.timings: Timings = {}
+        self.profiler: Optional[cProfile.Profile] = (
+            cProfile.Profile() if profile else None
+        )
+
+    def record(self, name: str, seconds: float, calls: int = 1):
+        timing = self.timings.get(name)
+        if timing is None:
+            self.timings[name] = [calls, seconds]
+        else:
+            timing[0] += calls
+            timing[1] += seconds
+
+    def timed(self, name: str, func: Callable, profile: bool = False) -> Callable:
+        record, perf_counter = self.record, time.perf_counter
+        profiler = self.profiler if profile else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiler is not None:
+                profiler.enable()
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+                if profiler is not None:
+                    profiler.disable()
+
+        return wrapper
+
+    def instrument(
+        self, obj: object, names: Mapping[str, str], profiled: Iterable[str] = ()
+    ):
+        """Replace the methods `names` (method -> stage) of `obj` by timed ones."""
+        profiled = set(profiled)
+        for method, name in names.items():
+            setattr(
+                obj,
+                method,
+                self.timed(name, getattr(obj, method), method in profiled),
+            )
+
+    def seconds(self, name: str) -> float:
+        return self.timings.get(name, (0, 0.0))[1]
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in self.timings.items()
+        }
+
+    def dump_pstats(self, path: str):
+        if self.profiler is None:
+            raise ValueError("Profiling is disabled, use AuditStats(profile=True)")
+        self.profiler.dump_stats(path)
+
+    def openmetrics(self, device: str = "") -> str:
+        return format_openmetrics([({"device": device}, self.as_dict())])
+
+    def __repr__(self):
+        total = sum(seconds for _, seconds in self.timings.values())
+        return f"<AuditStats {len(self.timings)} stages, {total:.4f}s>"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_openmetrics(
+    samples: Iterable[Tuple[Mapping[str, str], Mapping[str, Mapping[str, float]]]],
+) -> str:
+    """OpenMetrics text of (labels, AuditStats.as_dict()) pairs."""
+    seconds = [
+        "# TYPE ciscoconfaudit_stage_seconds counter",
+        "# UNIT ciscoconfaudit_stage_seconds seconds",
+        "# HELP ciscoconfaudit_stage_seconds Wall time spent in an audit stage.",
+    ]
+    calls = [
+        "# TYPE ciscoconfaudit_stage_calls counter",
+        "# HELP ciscoconfaudit_stage_calls Number of times an audit stage ran.",
+    ]
+    for labels, timings in samples:
+        for name, timing in timings.items():
+            text = ",".join(
+                f'{key}="{_label(value)}"'
+                for key, value in {**labels, "stage": name}.items()
+            )
+            seconds.append(
+                f"ciscoconfaudit_stage_seconds_total{{{text}}} {timing['seconds']}"
+            )
+            calls.append(
+                f"ciscoconfaudit_stage_calls_total{{{text}}} {timing['calls']}"
+            )
+    return "\n".join(seconds + calls + ["# EOF", ""])
+
+
+def write_openmetrics(fp: IO[str], results: Iterable[DeviceResult]) -> int:
+    """Write the stats of results audited with stats=True to `fp`."""
+    samples = [
+        ({"device": result.hostname, "source": result.source}, result.stats)
+        for result in results
+        if result.stats
+    ]
+    fp.write(format_openmetrics(samples))
+    return len(samples)
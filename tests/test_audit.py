@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from ciscoconfaudit import DEFAULT_RULE_PACK, CiscoConfAudit, Status
+
+FAILING = """\
+hostname failing
+!
+interface GigabitEthernet1
+ switchport mode access
+!
+end"""
+
+CLEAN = """\
+hostname clean
+!
+interface GigabitEthernet1
+ switchport mode access
+ no mop enabled
+ switchport port-security
+ switchport port-security mac-address sticky
+ spanning-tree portfast
+ spanning-tree bpduguard enable
+ spanning-tree guard root
+ no cdp enable
+ no lldp transmit
+ no lldp receive
+ ip verify source
+!
+end"""
+
+
+def audit(audit, running_config):
+    audit.global_config(running_config)
+    audit.interface_config()
+    return audit.global_findings, audit.interface_findings
+
+
+def test_fail_fast_instance_reused_across_configs():
+    rules = DEFAULT_RULE_PACK.select(["interface"])
+    reused = CiscoConfAudit(rules=rules, fail_fast=True)
+    audit(reused, FAILING)
+    assert reused.failed
+    assert audit(reused, CLEAN) == audit(
+        CiscoConfAudit(rules=rules, fail_fast=True), CLEAN
+    )
+    assert reused.interface_findings
+
+
+def test_findings_reset_on_new_config():
+    reused = CiscoConfAudit()
+    audit(reused, FAILING)
+    reused.global_config(CLEAN)
+    assert reused.interface_findings is None
+    assert reused.hostname == "clean"
+    assert any(f.status is Status.PASS for f in reused.global_findings)
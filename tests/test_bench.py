@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from ciscoconfaudit.bench import (
+    METRICS,
+    bench_config,
+    find_regressions,
+    format_results,
+)
+
+
+def test_sample_config(sample_config):
+    result = bench_config(sample_config, repeat=1)
+    assert set(result) == {"lines", *METRICS}
+    assert all(result[metric] > 0 for metric in METRICS)
+    header, row = format_results({"sample": result}).splitlines()
+    assert header.split()[:4] == ["size", "lines", "index", "s"]
+    assert row.split()[:2] == ["sample", str(result["lines"])]
+
+
+def test_regressions():
+    results = {"1k": dict.fromkeys(METRICS, 1.0)}
+    assert find_regressions(results, {"1k": dict.fromkeys(METRICS, 1.0)}) == []
+    slower = find_regressions(results, {"1k": {"index": 0.5, "global": 0.9}})
+    assert slower == ["1k index: 1.0000 > 0.5000 (+100%)"]
+    # Baselines from before a metric existed or was renamed skip it
+    assert find_regressions(results, {"1k": {"parse": 0.1}}) == []
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from ciscoconfaudit import BlockStore, CiscoConfAudit
+
+CASES = {
+    "banner with ! lines": """\
+hostname R1
+!
+banner motd ^C
+!
+Authorized access only
+!
+interface GigabitEthernet1
+ no ip address
+^C
+!
+interface GigabitEthernet2
+ switchport mode access
+!
+line vty 0 4
+ transport input ssh
+!
+end""",
+    "macro with ! lines": """\
+macro name ACCESS
+!
+ switchport mode access
+!
+@
+!
+interface GigabitEthernet1
+ switchport mode access
+!
+end""",
+    "block starting indented": """\
+hostname R1
+!
+ shutdown
+interface Vlan1
+ no ip address
+ shutdown
+!
+  ip ospf cost 10
+ description child of the comment above
+!
+line vty 0 4
+ exec-timeout 10 0
+!
+end""",
+    "indented comment": """\
+interface GigabitEthernet1
+ switchport mode access
+ !
+ spanning-tree portfast
+!
+ ! stray comment
+interface GigabitEthernet2
+ switchport mode access
+!
+end""",
+}
+
+
+def audit(running_config, blocks):
+    audit = CiscoConfAudit()
+    audit.blocks = blocks
+    audit.global_config(running_config)
+    audit.interface_config()
+    return audit
+
+
+def assert_same_audit(running_config, store):
+    indexed = audit(running_config, None)
+    stored = audit(running_config, store)
+    assert stored.hostname == indexed.hostname
+    assert stored.global_findings == indexed.global_findings
+    assert stored.interface_findings == indexed.interface_findings
+    return stored
+
+
+def test_sample_config(sample_config):
+    store = BlockStore()
+    assert assert_same_audit(sample_config, store).block_verdicts() is not None
+    # Again, answered from the store
+    hits = store.hits
+    assert_same_audit(sample_config, store)
+    assert store.hits > hits
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_cases(name):
+    store = BlockStore()
+    for _ in range(2):
+        assert_same_audit(CASES[name], store)
+
+
+def test_banner_with_comment_lines_is_indexed_whole():
+    stored = audit(CASES["banner with ! lines"], BlockStore())
+    assert stored.block_verdicts() is None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_configs(seed, random_configs):
+    # Shared by every config, as the store of a rule pack is
+    store = BlockStore()
+    for running_config in random_configs(random.Random(seed), 100):
+        assert_same_audit(running_config, store)
+    assert store.hits
+
+
+def test_block_split_counts_as_parse_time(sample_config):
+    stored = audit(sample_config, BlockStore())
+    assert stored.block_verdicts() is not None
+    assert stored.index is None
+    assert stored.parse_time > 0
+
+
+def test_store_is_opt_in():
+    assert CiscoConfAudit().blocks is None
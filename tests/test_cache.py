@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import pytest
+
+from ciscoconfaudit import DEFAULT_RULE_PACK, audit_config
+from ciscoconfaudit import cache as result_cache
+from ciscoconfaudit.cache import ResultCache
+
+CONFIGS = [
+    f"hostname R{idx}\n!\ninterface Vlan1\n shutdown\n!\nend\n" for idx in range(3)
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.sqlite3")
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # Distinct access times, however fast the entries are touched
+    ticks = itertools.count()
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(ticks))
+
+
+def fill(cache, configs=CONFIGS):
+    for config in configs:
+        cache.put(config, audit_config(config, rules=cache.rules))
+
+
+def test_hit_keyed_on_config(path):
+    with ResultCache(path) as cache:
+        assert cache.get(CONFIGS[0]) is None
+        fill(cache, CONFIGS[:1])
+        result = cache.get(CONFIGS[0], "r0")
+        assert cache.get(CONFIGS[1]) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+    assert result.source == "r0"
+    assert result.hostname == "R0"
+    assert result.findings == audit_config(CONFIGS[0]).findings
+
+
+def test_miss_for_other_rules(path):
+    with ResultCache(path) as cache:
+        fill(cache)
+    with ResultCache(path, rules=DEFAULT_RULE_PACK.select(["interface"])) as cache:
+        assert cache.get(CONFIGS[0]) is None
+        assert len(cache) == len(CONFIGS)
+
+
+def test_least_recently_used_evicted(path):
+    with ResultCache(path) as cache:
+        fill(cache)
+        sizes = cache.size()
+        cache.get(CONFIGS[0])
+        # Room for two entries, whichever they are
+        assert cache.evict(sizes * 2 // 3 + 1) == 1
+        assert cache.get(CONFIGS[0]) is not None
+        assert cache.get(CONFIGS[1]) is None
+        assert cache.get(CONFIGS[2]) is not None
+
+
+def test_put_evicts_above_max_bytes(path):
+    with ResultCache(path, max_bytes=1) as cache:
+        fill(cache)
+        assert len(cache) == 0
+
+
+def test_invalidate(path):
+    with ResultCache(path, rules=DEFAULT_RULE_PACK.select(["interface"])) as cache:
+        fill(cache)
+    with ResultCache(path) as cache:
+        fill(cache, CONFIGS[:1])
+        assert cache.invalidate(stale_only=True) == len(CONFIGS)
+        assert len(cache) == 1
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+
+
+def test_command_line(path, capsys):
+    with ResultCache(path) as cache:
+        fill(cache)
+        size = cache.size()
+    assert result_cache.main(["--path", path, "stats"]) == 0
+    assert capsys.readouterr().out == f"{path}: 3 entries, {size} bytes\n"
+    assert result_cache.main(["--path", path, "prune"]) == 0
+    assert capsys.readouterr().out == f"{path}: dropped 0 entries\n"
+    assert result_cache.main(["--path", path, "clear"]) == 0
+    assert capsys.readouterr().out == f"{path}: dropped 3 entries\n"
+    with ResultCache(path) as cache:
+        assert len(cache) == 0
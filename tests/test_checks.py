@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ciscoconfaudit import DEFAULT_RULE_PACK, Status, audit_config
+from ciscoconfaudit.facts import CHECK_TITLES
+from ciscoconfaudit.fleet import ComplianceMatrix
+
+VLAN1_OFF = "interface Vlan1\n no ip address\n shutdown\n!\n"
+VLAN1_ON = "interface Vlan1\n ip address 10.0.0.1 255.255.255.0\n!\n"
+VTY_HARDENED = (
+    "line vty 0 4\n transport input ssh\n exec-timeout 10 0\n logging synchronous\n!\n"
+)
+VTY_TELNET = "line vty 5 15\n transport input telnet\n!\n"
+
+
+def findings(running_config, rule_id, rules=DEFAULT_RULE_PACK):
+    result = audit_config(running_config, rules=rules)
+    return [
+        (finding.target, finding.status, finding.text)
+        for finding in result.interface_findings
+        if finding.rule_id == rule_id
+    ]
+
+
+@pytest.mark.parametrize(
+    "running_config, expected",
+    [
+        ("hostname R1\n", [("device", Status.NOT_FOUND, "'interface Vlan1'")]),
+        (
+            VLAN1_OFF,
+            [
+                (
+                    "interface Vlan1",
+                    Status.PASS,
+                    "'interface Vlan1' has no ip address and is shutdown",
+                )
+            ],
+        ),
+        (
+            VLAN1_ON,
+            [
+                (
+                    "interface Vlan1",
+                    Status.FAIL,
+                    "'interface Vlan1' has no ip address and is shutdown",
+                )
+            ],
+        ),
+    ],
+)
+def test_vlan1(running_config, expected):
+    assert findings(running_config, "I015") == expected
+
+
+def test_vty_lines_hardened():
+    assert findings(VTY_HARDENED, "V001") == [
+        ("line vty 0 4", Status.PASS, "line vty 0 4 --> transport input ssh"),
+        ("device", Status.PASS, "transport input ssh (All VTY lines)"),
+    ]
+    assert findings(VTY_HARDENED, "V002") == []
+    assert findings(VTY_HARDENED, "V003") == []
+
+
+def test_vty_lines_not_hardened():
+    running_config = VTY_HARDENED + VTY_TELNET
+    assert findings(running_config, "V001") == [
+        ("line vty 0 4", Status.PASS, "line vty 0 4 --> transport input ssh"),
+        ("line vty 5 15", Status.FAIL, "line vty 5 15 --> transport input ssh"),
+    ]
+    assert findings(running_config, "V002") == [
+        ("line vty 5 15", Status.FAIL, "line vty 5 15 --> exec-timeout 10 0"),
+    ]
+    assert findings(running_config, "V003") == [
+        ("line vty 5 15", Status.RECOMMENDED, "line vty 5 15 --> logging synchronous"),
+    ]
+
+
+def test_no_vty_lines():
+    assert findings("hostname R1\n", "V001") == [
+        ("device", Status.FAIL, "transport input ssh")
+    ]
+
+
+def test_vty_checks_selected_alone():
+    rules = DEFAULT_RULE_PACK.select(["V002"])
+    result = audit_config(VTY_TELNET, rules=rules)
+    assert {finding.rule_id for finding in result.findings} == {"V002"}
+
+
+def test_matrix_titles():
+    matrix = ComplianceMatrix()
+    for rule_id, title in CHECK_TITLES.items():
+        assert matrix.titles[rule_id] == title
+    matrix.add(audit_config(VLAN1_ON + VTY_TELNET))
+    summary = {row["rule_id"]: row for row in matrix.summary()}
+    for rule_id, title in CHECK_TITLES.items():
+        assert summary[rule_id]["title"] == title
+        assert summary[rule_id]["failed"] == (rule_id != "V003")
+    assert matrix.find_rules("(All VTY lines)") == ["V001", "V002", "V003"]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import json
+import subprocess
+import sys
+import tarfile
+
+import pytest
+
+from ciscoconfaudit.cli import main
+
+SWITCH = """\
+hostname {0}
+!
+interface GigabitEthernet1
+ switchport mode access
+!
+interface GigabitEthernet2
+ switchport mode access
+!
+interface GigabitEthernet3
+ switchport mode access
+ no mop enabled
+!
+end
+"""
+
+
+@pytest.fixture
+def configs(tmp_path):
+    for name in ("SW1", "SW2"):
+        (tmp_path / f"{name}.txt").write_text(SWITCH.format(name), encoding="utf-8")
+    return tmp_path
+
+
+def run(capsys, *argv):
+    code = main(["-j", "1", *argv])
+    return code, capsys.readouterr().out
+
+
+def devices(out):
+    return sorted({json.loads(line)["device"] for line in out.splitlines()})
+
+
+def test_exit_status(capsys, configs):
+    assert run(capsys, str(configs / "SW1.txt"), "-i", "I001")[0] == 1
+    assert run(capsys, str(configs / "SW1.txt"), "-i", "G001")[0] == 0
+
+
+def test_table(capsys, configs):
+    code, out = run(capsys, str(configs / "SW1.txt"), "-f", "table", "-i", "I001")
+    assert "SW1 Interface-Level Audit" in out
+    assert "interface GigabitEthernet1 no mop enabled" in out
+    assert "interface GigabitEthernet2 no mop enabled" in out
+
+
+def test_table_summary(capsys, configs):
+    _, out = run(
+        capsys, str(configs / "SW1.txt"), "-f", "table", "--summary", "-i", "I001"
+    )
+    assert "no mop enabled (2 interfaces: GigabitEthernet1, GigabitEthernet2)" in out
+    assert "interface GigabitEthernet1 no mop enabled" not in out
+
+
+def test_table_failures_only_and_limit(capsys, configs):
+    argv = [str(configs / "SW1.txt"), "-f", "table", "-i", "I001,G001"]
+    _, out = run(capsys, *argv)
+    assert "no service tcp-small-servers" in out
+    _, out = run(capsys, *argv, "--failures-only")
+    assert "no service tcp-small-servers" not in out
+    assert "interface GigabitEthernet2 no mop enabled" in out
+    _, out = run(capsys, *argv, "--failures-only", "--limit", "1")
+    assert "interface GigabitEthernet2 no mop enabled" not in out
+    assert "Rows 1-1 of 2" in out
+
+
+def test_sources(capsys, configs):
+    archive = configs / "archive" / "configs.tar.gz"
+    archive.parent.mkdir()
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(configs / "SW1.txt", "SW3.txt")
+    assert devices(run(capsys, str(configs / "SW2.txt"))[1]) == ["SW2"]
+    assert devices(run(capsys, str(configs / "*.txt"))[1]) == ["SW1", "SW2"]
+    assert devices(run(capsys, str(archive))[1]) == ["SW1"]
+    assert devices(run(capsys, str(configs))[1]) == ["SW1", "SW2"]
+    # A file holding two configs, one after the other
+    both = configs / "archive" / "both.txt"
+    both.write_text(SWITCH.format("SW4") + SWITCH.format("SW5"), encoding="utf-8")
+    assert devices(run(capsys, str(both))[1]) == ["SW4", "SW5"]
+
+
+@pytest.mark.parametrize("path", ["missing.txt", "missing-*.txt"])
+def test_missing_source(capsys, configs, path):
+    with pytest.raises(SystemExit) as exc:
+        main([str(configs / path)])
+    assert exc.value.code == 2
+    assert "missing" in capsys.readouterr().err
+
+
+def test_module_entry_point(configs):
+    process = subprocess.run(
+        [sys.executable, "-m", "ciscoconfaudit", "-j", "1", str(configs / "SW1.txt")],
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode == 1
+    assert devices(process.stdout) == ["SW1"]
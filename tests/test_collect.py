@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from ciscoconfaudit import FakeTransport, collect_audit
+
+
+def collect(fetch, *hosts):
+    return list(
+        collect_audit([{"host": host} for host in hosts], fetch, audit_workers=1)
+    )
+
+
+def test_one_line_reply_is_audited_as_text():
+    (result,) = collect(FakeTransport("% Authorization failed"), "r1")
+    assert result.error is None
+    assert result.source == "r1"
+    assert result.hostname == "Device"
+
+
+def test_config_file_path(sample_path):
+    (result,) = collect(FakeTransport(sample_path), "r1")
+    assert result.error is None
+    assert result.hostname == "Cat8000V"
+
+
+def test_unknown_device_and_timeout(sample_path):
+    fetch = FakeTransport({"r1": sample_path, "r2": "hostname R2\n"})
+    results = {result.source: result for result in collect(fetch, "r1", "r2", "r3")}
+    assert results["r1"].hostname == "Cat8000V"
+    assert results["r2"].hostname == "R2"
+    assert results["r3"].error.startswith("ConnectionError")
+    (late,) = collect_audit(
+        [{"host": "r1"}], FakeTransport(sample_path, delay=1.0), timeout=0.1
+    )
+    assert late.error.startswith("TimeoutError")
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from ciscoconfaudit import CiscoConfAudit
+from ciscoconfaudit.incremental import IncrementalAuditor
+
+NEW_BLOCKS = [
+    "interface GigabitEthernet9\n switchport mode access\n no cdp enable",
+    "interface Vlan1\n no ip address\n shutdown",
+    "line vty 5 15\n transport input telnet",
+    "no cdp run",
+    "hostname EDITED",
+]
+
+
+def split_blocks(running_config):
+    blocks, lines = [], []
+    for line in running_config.splitlines():
+        lines.append(line)
+        if line == "!":
+            blocks.append("\n".join(lines))
+            lines = []
+    return blocks + ["\n".join(lines)]
+
+
+def add(rng, blocks):
+    blocks.insert(rng.randint(0, len(blocks)), rng.choice(NEW_BLOCKS))
+
+
+def remove(rng, blocks):
+    del blocks[rng.randrange(len(blocks))]
+
+
+def reorder(rng, blocks):
+    rng.shuffle(blocks)
+
+
+def assert_same_audit(auditor, running_config):
+    result = auditor.audit("device", running_config)
+    audit = CiscoConfAudit()
+    audit.global_config(running_config)
+    audit.interface_config()
+    assert result.hostname == audit.hostname
+    assert result.global_findings == audit.global_findings
+    assert result.interface_findings == audit.interface_findings
+
+
+@pytest.mark.parametrize("edit", [add, remove, reorder])
+@pytest.mark.parametrize("seed", range(3))
+def test_edited_blocks(sample_config, edit, seed):
+    rng = random.Random(seed)
+    auditor = IncrementalAuditor()
+    blocks = split_blocks(sample_config)
+    assert_same_audit(auditor, sample_config)
+    for _ in range(5):
+        edit(rng, blocks)
+        assert_same_audit(auditor, "\n".join(blocks))
+    assert auditor.full == 1
+    assert auditor.incremental + auditor.skipped == 5
+
+
+def test_unchanged_config_skipped(sample_config):
+    auditor = IncrementalAuditor()
+    first = auditor.audit("device", sample_config)
+    assert auditor.audit("device", sample_config) is first
+    assert (auditor.full, auditor.skipped) == (1, 1)
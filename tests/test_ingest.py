@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import gzip
+import io
+import tarfile
+
+import pytest
+
+from ciscoconfaudit.ingest import iter_configs
+
+TEXTS = [
+    f"hostname R{idx}\n!\ninterface GigabitEthernet1\n shutdown\n!\nend\n"
+    for idx in range(3)
+]
+CONFIGS = "".join(TEXTS)
+
+
+def test_mapped_file_closed_when_abandoned(tmp_path):
+    path = tmp_path / "configs.txt"
+    path.write_text(CONFIGS, encoding="utf-8")
+    configs = iter_configs(str(path))
+    first = next(configs)
+    assert first.text.startswith("hostname R0")
+    # Used to raise BufferError: the map could not be closed while a
+    # finditer() over it was still alive
+    configs.close()
+
+
+def configs_of(path, split="end"):
+    # Mapped files leave the line ending of `end` out, streamed ones keep it
+    return [
+        (config.source, config.text.rstrip("\r\n"))
+        for config in iter_configs(path, split)
+    ]
+
+
+def expected(name, texts=TEXTS):
+    return [
+        (name if idx == 1 else f"{name}#{idx}", text.rstrip("\n"))
+        for idx, text in enumerate(texts, 1)
+    ]
+
+
+def test_concatenated_file(tmp_path):
+    path = tmp_path / "configs.txt"
+    path.write_text(CONFIGS, encoding="utf-8")
+    assert configs_of(path) == expected(str(path))
+    assert configs_of(path, "file") == expected(str(path), [CONFIGS])
+
+
+def test_crlf_and_trailing_lines(tmp_path):
+    path = tmp_path / "configs.txt"
+    path.write_bytes((CONFIGS + "hostname tail\n").replace("\n", "\r\n").encode())
+    configs = configs_of(path)
+    assert len(configs) == 4
+    assert configs[-1] == (f"{path}#4", "hostname tail")
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.touch()
+    assert configs_of(path) == []
+
+
+def test_gzip(tmp_path):
+    path = tmp_path / "configs.txt.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fp:
+        fp.write(CONFIGS)
+    assert configs_of(path) == expected(str(path))
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz", "w:bz2", "w:xz"])
+def test_tar(tmp_path, mode):
+    path = tmp_path / "configs.tar"
+    with tarfile.open(path, mode) as archive:
+        for name, text in [("a.txt", CONFIGS), ("b/c.txt", TEXTS[0])]:
+            data = text.encode("utf-8")
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    assert configs_of(path) == expected(f"{path}:a.txt") + expected(
+        f"{path}:b/c.txt", TEXTS[:1]
+    )
+
+
+def test_directory(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text(TEXTS[1], encoding="utf-8")
+    (tmp_path / "a.txt").write_text(TEXTS[0], encoding="utf-8")
+    assert configs_of(tmp_path) == expected(
+        str(tmp_path / "a.txt"), TEXTS[:1]
+    ) + expected(str(tmp_path / "sub" / "b.txt"), TEXTS[1:2])
+
+
+def test_unknown_split_mode(tmp_path):
+    with pytest.raises(ValueError):
+        configs_of(tmp_path, "line")
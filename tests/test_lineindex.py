@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+from ciscoconfparse2 import CiscoConfParse
+
+from ciscoconfaudit.lineindex import LineIndex
+
+CASES = {
+    "banner": [
+        "hostname R1",
+        "banner motd ^C",
+        "Authorized access only",
+        " interface GigabitEthernet1",
+        "!",
+        "^C",
+        "interface GigabitEthernet1",
+        " shutdown",
+    ],
+    "one line banner": [
+        "banner exec ^C hello ^C",
+        "interface Vlan1",
+        " no ip address",
+    ],
+    "banner with other delimiter": [
+        "banner login #",
+        "line vty 0 4",
+        " transport input telnet",
+        "#",
+        "line vty 0 4",
+        " transport input ssh",
+    ],
+    "macro": [
+        "macro name ACCESS",
+        " switchport mode access",
+        "interface GigabitEthernet1",
+        "@",
+        "interface GigabitEthernet2",
+        " switchport mode access",
+    ],
+    "indented comments": [
+        "interface GigabitEthernet1",
+        " ! description of the port",
+        " shutdown",
+        "  ! deeper comment",
+        "   ip address 10.0.0.1 255.255.255.0",
+        "!",
+        " ! after a top-level comment",
+        "router ospf 1",
+        " network 10.0.0.0 0.0.0.255 area 0",
+    ],
+    "blank lines": [
+        "interface GigabitEthernet1",
+        "",
+        " shutdown",
+        "   ",
+        " no ip address",
+        "",
+        "line vty 0 4",
+        "\t exec-timeout 5 0",
+    ],
+    "uneven indentation": [
+        "router bgp 65000",
+        "   address-family ipv4",
+        "    neighbor 10.0.0.2 activate",
+        "  bgp log-neighbor-changes",
+        " exit-address-family",
+        "   stray",
+        "hostname R2",
+    ],
+}
+
+
+def assert_same_tree(lines):
+    parse = CiscoConfParse(lines, syntax="ios", factory=True)
+    index = LineIndex(lines)
+    for idx, obj in enumerate(parse.config_objs):
+        assert index.children.get(idx, []) == [
+            child.linenum for child in obj.children
+        ], (idx, lines)
+        assert (obj.parent is obj) == (index.parents[idx] < 0), (idx, lines)
+    assert index.re_match_iter_typed(
+        r"^hostname\s+(\S+)", default="Device"
+    ) == parse.re_match_iter_typed(r"^hostname\s+(\S+)", default="Device")
+
+
+def test_sample_config(sample_config):
+    assert_same_tree(sample_config.splitlines())
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_cases(name):
+    assert_same_tree(CASES[name])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_configs(seed, random_lines):
+    rng = random.Random(seed)
+    for _ in range(200):
+        assert_same_tree(random_lines(rng))
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import pytest
+
+from ciscoconfaudit import Finding, audit_config
+from ciscoconfaudit.cache import ResultCache
+from ciscoconfaudit.server import decode_result, encode_result
+
+
+def reduced(result):
+    return [f.__reduce__() for f in result.findings]
+
+
+@pytest.fixture
+def sample_result(sample_config):
+    result = audit_config(sample_config)
+    # The sample has per-target findings kept as templates
+    assert any(f.__reduce__()[1][4] for f in result.findings)
+    return result
+
+
+def test_pickle_round_trip(sample_result):
+    result = pickle.loads(pickle.dumps(sample_result))
+    assert reduced(result) == reduced(sample_result)
+
+
+def test_server_round_trip(sample_result):
+    result = decode_result(encode_result(sample_result))
+    assert reduced(result) == reduced(sample_result)
+
+
+def test_cache_round_trip(sample_config, sample_result):
+    with ResultCache(":memory:") as cache:
+        cache.put(sample_config, sample_result)
+        result = cache.get(sample_config, sample_result.source)
+    assert reduced(result) == reduced(sample_result)
+
+
+def test_four_field_rows():
+    finding = Finding.from_row(["I001", "interface Gi1", "FAIL", "interface Gi1 x"])
+    assert finding.__reduce__()[1][3:] == ("interface Gi1 x", False)
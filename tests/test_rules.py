@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import random
+import re
+
+import pytest
+
+from ciscoconfaudit.facts import GLOBAL_FACTS, INTERFACE_FACTS, VTY_FACTS
+from ciscoconfaudit.rules import (
+    GLOBAL_RULES,
+    TokenIndex,
+    leading_tokens,
+    literal_prefix,
+    required_literal,
+)
+
+BUILT_IN = [rule.pattern for rule in GLOBAL_RULES] + [
+    pattern for _, pattern in INTERFACE_FACTS + VTY_FACTS + GLOBAL_FACTS
+]
+
+
+@pytest.mark.parametrize(
+    "pattern, prefix",
+    [
+        (r"^ip\sssh\sversion\s2", (False, ("ip", "ssh"))),
+        (r"^no\s+service\s+pad", (False, ("no", "service"))),
+        (r"^\s+shutdown\s", (True, ("shutdown",))),
+        (r"^line\svty", (False, ("line",))),
+        # Optional or repeated whitespace may join the words: first word only
+        (r"^ip\sssh\s*version", (False, ("ip",))),
+        (r"^ip\s?http", None),
+        (r"^\s*no\scdp", None),
+        (r"^(ip|no)\s", None),
+        (r"ssh", None),
+    ],
+)
+def test_literal_prefix(pattern, prefix):
+    assert literal_prefix(pattern) == prefix
+
+
+def test_leading_tokens_of_alternatives():
+    assert leading_tokens(r"^ip\sssh\s|^no\sip\s") == [
+        (False, ("ip", "ssh")),
+        (False, ("no", "ip")),
+    ]
+    # One alternative without a prefix sends the pattern to every line
+    assert leading_tokens(r"^ip\sssh\s|ssh") is None
+
+
+@pytest.mark.parametrize(
+    "pattern, literal",
+    [
+        (r"ssh", "ssh"),
+        (r"^\s+shutdown", "shutdown"),
+        (r"^ip\sssh\sversion\s2", "version"),
+        (r"^ip\s?http", None),
+        (r"(ip|no)", None),
+    ],
+)
+def test_required_literal(pattern, literal):
+    assert required_literal(pattern) == literal
+
+
+def assert_same_matches(patterns, lines):
+    compiled = [re.compile(pattern) for pattern in patterns]
+    index = TokenIndex(patterns)
+    assert index.search(lines) == [
+        any(regex.search(line) for line in lines) for regex in compiled
+    ], (patterns, lines)
+    for line in lines:
+        assert sorted(index.matches(line)) == [
+            idx for idx, regex in enumerate(compiled) if regex.search(line)
+        ], (patterns, line)
+
+
+def test_whitespace_between_prefix_words():
+    patterns = [
+        r"^ip\sssh\s*version",
+        r"^ip\s?http",
+        r"^no\s+service\s+pad",
+        r"^\s+shutdown",
+        r"^aaa\snew-model$",
+        r"ssh",
+    ]
+    lines = [
+        "ip sshversion 2",
+        "ip ssh  version 2",
+        "iphttp server",
+        "ip http server",
+        "no  service\tpad",
+        "no service padding",
+        "  shutdown",
+        "shutdown",
+        "\tshutdown",
+        "aaa new-model",
+        "aaa new-model x",
+        "ip-ssh",
+        "",
+    ]
+    assert_same_matches(patterns, lines)
+
+
+def test_built_in_patterns(sample_config):
+    assert_same_matches(BUILT_IN, sample_config.splitlines())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_patterns(seed, random_pattern, random_line):
+    rng = random.Random(seed)
+    for _ in range(60):
+        patterns = rng.sample(BUILT_IN, 10) + [
+            random_pattern(rng) for _ in range(rng.randint(1, 15))
+        ]
+        try:
+            for pattern in patterns:
+                re.compile(pattern)
+        except re.error:
+            continue
+        for _ in range(30):
+            assert_same_matches(
+                patterns, [random_line(rng) for _ in range(rng.randint(1, 5))]
+            )
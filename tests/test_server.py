@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import os
+import stat
+import threading
+
+import pytest
+
+from ciscoconfaudit import server
+
+
+@pytest.fixture
+def private_tempdir(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(server.tempfile, "gettempdir", lambda: str(tmp_path))
+    return tmp_path
+
+
+def test_default_socket_directory_is_private(private_tempdir):
+    address = server.default_address()
+    assert os.path.dirname(address) != str(private_tempdir)
+    with server.AuditServer(workers=0) as service:
+        directory = os.stat(os.path.dirname(address))
+        assert stat.S_IMODE(directory.st_mode) == 0o700
+        thread = threading.Thread(target=service.serve_forever)
+        thread.start()
+        try:
+            with server.AuditClient() as client:
+                assert client.ping()["workers"] == 0
+        finally:
+            service.shutdown()
+            thread.join()
+
+
+def test_client_refuses_socket_of_another_user(private_tempdir, monkeypatch):
+    with server.AuditServer(workers=0) as service:
+        monkeypatch.setattr(
+            server.os, "getuid", lambda: os.stat(service.address).st_uid + 1
+        )
+        with pytest.raises(PermissionError):
+            server.AuditClient(service.address)